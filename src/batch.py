@@ -0,0 +1,107 @@
+from collections.abc import Iterable, Iterator
+from random_stream import RandomStream
+from instance_io import KnapsackInstance
+import importlib
+import os
+
+
+# Решатели, доступные по имени. Модули импортируются только при первом использовании
+SOLVERS = {
+    "greedy": ("greedy", "KnapsackGreedy"),
+    "dynamic": ("dynamic", "KnapsackDP"),
+    "branch_and_bound": ("branch_and_bound", "KnapsackBranchAndBound"),
+    "genetic": ("genetic", "KnapsackGenetic"),
+    "packed_genetic": ("packed_genetic", "KnapsackPackedGenetic"),
+    "vectorized_genetic": ("vectorized_genetic", "KnapsackVectorizedGenetic"),
+}
+
+GENETIC_SOLVERS = ("genetic", "packed_genetic", "vectorized_genetic")
+
+# Решатели, которые могут остановиться по времени и вернуть лучшее найденное решение
+TIME_LIMITED_SOLVERS = GENETIC_SOLVERS + ("branch_and_bound",)
+
+
+def create_solver(solver_config: dict):
+    solver_parameters = dict(solver_config)
+    module_name, class_name = SOLVERS[solver_parameters.pop("solver")]
+    solver_class = getattr(importlib.import_module(module_name), class_name)
+    return solver_class(**solver_parameters)
+
+
+def solve_many(instances: Iterable[tuple[list[tuple[float, float]], int] | KnapsackInstance],
+               solver_config: dict,
+               workers: int = None,
+               ordered: bool = False,
+               max_pending: int = None,
+               time_limit: float = None,
+               seed=None,
+               rng: RandomStream = None) -> Iterator[tuple[int, tuple]]:
+    # Пул процессов нужен только пакетному запуску, создание решателей по имени обходится без него
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+    workers = workers if workers is not None else os.cpu_count()
+    max_pending = max_pending if max_pending is not None else 2 * workers
+    solver_config = dict(solver_config)
+    if time_limit is not None:
+        if solver_config["solver"] not in TIME_LIMITED_SOLVERS:
+            raise ValueError(f"Solver {solver_config['solver']} does not support time_limit")
+        solver_config["time_limit"] = time_limit
+    if rng is None and seed is not None:
+        rng = RandomStream(seed)
+
+    executor = ProcessPoolExecutor(max_workers=workers,
+                                   initializer=_initialize_batch_worker,
+                                   initargs=(solver_config,))
+    try:
+        instances_iterator = enumerate(instances)
+        is_exhausted = False
+        pending = {}
+        completed = {}
+        next_index = 0
+
+        while True:
+            # Новые задачи берутся из итератора, только пока не набралось max_pending невыданных результатов
+            while not is_exhausted and len(pending) + len(completed) < max_pending:
+                try:
+                    index, instance = next(instances_iterator)
+                except StopIteration:
+                    is_exhausted = True
+                    break
+                # Отображенные в память экземпляры передаются процессам по пути к файлу
+                objects, capacity = instance.task_conditions if isinstance(instance, KnapsackInstance) else instance
+                # Потоки выдаются задачам в порядке номеров, поэтому не зависят от числа процессов
+                random_stream = rng.spawn(1)[0] if rng is not None else None
+                pending[executor.submit(_solve_instance, index, objects, capacity, random_stream)] = index
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                if ordered:
+                    completed[index] = future.result()
+                else:
+                    yield index, future.result()
+
+            while next_index in completed:
+                yield next_index, completed.pop(next_index)
+                next_index = next_index + 1
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Состояние рабочего процесса: решатель создается один раз и переиспользуется для всех задач
+
+_batch_solver = None
+
+
+def _initialize_batch_worker(solver_config: dict) -> None:
+    global _batch_solver
+    _batch_solver = create_solver(solver_config)
+
+
+def _solve_instance(index: int, objects: list[tuple[float, float]], capacity: int, random_stream: RandomStream):
+    if random_stream is not None and hasattr(_batch_solver, "rng"):
+        _batch_solver.rng = random_stream
+    return _batch_solver.get_solution(objects, capacity)
@@ -0,0 +1,263 @@
+from batch import create_solver, GENETIC_SOLVERS
+from branch_and_bound import get_upper_bound
+from genetic_core import BaseGenetic
+from random_stream import RandomStream
+from pathlib import Path
+import argparse
+import csv
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+
+DEFAULT_SIZES = (50, 200, 1000, 10000, 100000)
+CROSSOVER_FUNCTIONS = ("single_point_crossover", "zigzag_crossover", "greedy_crossover")
+MUTATION_FUNCTIONS = ("each_gene_mutation", "one_gene_mutation")
+
+
+class InstanceGenerator:
+
+    # Семейства задач из работ Писингера
+    FAMILIES = ("uncorrelated", "weakly_correlated", "strongly_correlated", "inverse_strongly_correlated",
+                "subset_sum")
+
+    def __init__(self, data_range: int = 1000, capacity_ratio: float = 0.5):
+        self.__data_range = data_range
+        self.__capacity_ratio = capacity_ratio
+
+    def get_instance(self, family: str, number_of_objects: int,
+                     random_stream: RandomStream) -> tuple[list[tuple[int, int]], int]:
+        generator_function = getattr(self, "_InstanceGenerator__" + family)
+        objects = [generator_function(random_stream) for _ in range(number_of_objects)]
+        capacity = max(int(self.__capacity_ratio * sum(weight for _, weight in objects)), 1)
+        return objects, capacity
+
+    # Функции генерации объекта (ценность, вес)
+
+    def __uncorrelated(self, random_stream: RandomStream) -> tuple[int, int]:
+        return random_stream.randint(1, self.__data_range), random_stream.randint(1, self.__data_range)
+
+    def __weakly_correlated(self, random_stream: RandomStream) -> tuple[int, int]:
+        weight = random_stream.randint(1, self.__data_range)
+        spread = self.__data_range // 10
+        return max(random_stream.randint(weight - spread, weight + spread), 1), weight
+
+    def __strongly_correlated(self, random_stream: RandomStream) -> tuple[int, int]:
+        weight = random_stream.randint(1, self.__data_range)
+        return weight + self.__data_range // 10, weight
+
+    def __inverse_strongly_correlated(self, random_stream: RandomStream) -> tuple[int, int]:
+        value = random_stream.randint(1, self.__data_range)
+        return value, value + self.__data_range // 10
+
+    def __subset_sum(self, random_stream: RandomStream) -> tuple[int, int]:
+        weight = random_stream.randint(1, self.__data_range)
+        return weight, weight
+
+
+def get_default_solver_configs(number_of_iterations: int = 100, size_of_population: int = 50) -> list[dict]:
+    # max_number_of_objects ограничивает размеры, на которых запускается медленный решатель
+    genetic_parameters = dict(initial_population_function="get_initial_population",
+                              fitness_evaluation_function="fitness_evaluation_without_zeroing_out",
+                              number_of_random_initial_individuals=size_of_population,
+                              mutation_probability=0.01,
+                              number_of_iterations=number_of_iterations)
+    solver_configs = [
+        dict(name="greedy", config=dict(solver="greedy")),
+        dict(name="dynamic", config=dict(solver="dynamic"), max_number_of_objects=10000),
+        dict(name="branch_and_bound", config=dict(solver="branch_and_bound", max_number_of_nodes=1000000)),
+    ]
+    for crossover_function in CROSSOVER_FUNCTIONS:
+        for mutation_function in MUTATION_FUNCTIONS:
+            solver_configs.append(dict(name=f"genetic:{crossover_function}:{mutation_function}",
+                                       config=dict(solver="genetic", crossover_function=crossover_function,
+                                                   mutation_function=mutation_function, **genetic_parameters),
+                                       max_number_of_objects=1000))
+    solver_configs.append(dict(name="genetic:memetic",
+                               config=dict(solver="genetic", crossover_function="single_point_crossover",
+                                           mutation_function="each_gene_mutation", use_local_search=True,
+                                           local_search_fraction=0.1, **genetic_parameters),
+                               max_number_of_objects=1000))
+    solver_configs.append(dict(name="packed_genetic",
+                               config=dict(solver="packed_genetic", crossover_function="single_point_crossover",
+                                           mutation_function="each_gene_mutation", **genetic_parameters),
+                               max_number_of_objects=10000))
+    solver_configs.append(dict(name="vectorized_genetic",
+                               config=dict(solver="vectorized_genetic", crossover_function="single_point_crossover",
+                                           mutation_function="each_gene_mutation", **genetic_parameters),
+                               max_number_of_objects=100000))
+    return solver_configs
+
+
+class KnapsackBenchmark:
+
+    def __init__(self,
+                 solver_configs: list[dict] = None,
+                 families: tuple[str] = InstanceGenerator.FAMILIES,
+                 sizes: tuple[int] = DEFAULT_SIZES,
+                 number_of_repeats: int = 1,
+                 measure_memory: bool = True,
+                 seed=0,
+                 instance_generator: InstanceGenerator = None,
+                 max_number_of_dp_cells: int = 500000000,
+                 max_number_of_reference_nodes: int = 200000
+                 ):
+        self.__solver_configs = solver_configs if solver_configs is not None else get_default_solver_configs()
+        self.__families = families
+        self.__sizes = sizes
+        self.__number_of_repeats = number_of_repeats
+        self.__measure_memory = measure_memory
+        self.__seed = seed
+        self.__instance_generator = instance_generator if instance_generator is not None else InstanceGenerator()
+        self.__max_number_of_dp_cells = max_number_of_dp_cells
+        self.__max_number_of_reference_nodes = max_number_of_reference_nodes
+
+    def run(self, progress=None) -> list[dict]:
+        environment = get_environment()
+        records = []
+        for family in self.__families:
+            for number_of_objects in self.__sizes:
+                # Задача зависит только от зерна, семейства и размера, но не от набора решателей
+                instance_stream = RandomStream(f"{self.__seed}:{family}:{number_of_objects}")
+                objects, capacity = self.__instance_generator.get_instance(family, number_of_objects, instance_stream)
+                reference_value, reference_solver = self.__get_reference(objects, capacity)
+                upper_bound = get_upper_bound(objects, capacity)
+
+                for solver_config in self.__solver_configs:
+                    if not self.__is_applicable(solver_config, objects, capacity):
+                        continue
+                    record = dict(environment, family=family, number_of_objects=number_of_objects, capacity=capacity,
+                                  solver=solver_config["name"])
+                    record.update(self.__run_solver(solver_config["config"], objects, capacity,
+                                                    f"{self.__seed}:{family}:{number_of_objects}:{solver_config['name']}"))
+                    record["reference_value"] = reference_value
+                    record["reference_solver"] = reference_solver
+                    record["optimality_gap"] = get_gap(reference_value, record["value"])
+                    record["upper_bound"] = upper_bound
+                    record["upper_bound_gap"] = get_gap(upper_bound, record["value"])
+                    records.append(record)
+                    if progress is not None:
+                        progress(record)
+        return records
+
+    def __is_applicable(self, solver_config: dict, objects: list[tuple[int, int]], capacity: int) -> bool:
+        max_number_of_objects = solver_config.get("max_number_of_objects")
+        if max_number_of_objects is not None and len(objects) > max_number_of_objects:
+            return False
+        if solver_config["config"]["solver"] == "dynamic":
+            return len(objects) * (capacity + 1) <= self.__max_number_of_dp_cells
+        return True
+
+    def __get_reference(self, objects: list[tuple[int, int]], capacity: int) -> tuple[float, str]:
+        # Точное значение дает динамическое программирование, если таблица помещается в лимит,
+        # иначе - лучшее найденное методом ветвей и границ с ограничением числа узлов
+        if len(objects) * (capacity + 1) <= self.__max_number_of_dp_cells:
+            _, sum_value, _ = create_solver(dict(solver="dynamic")).get_solution(objects, capacity)
+            return sum_value, "dynamic"
+        solver = create_solver(dict(solver="branch_and_bound", max_number_of_nodes=self.__max_number_of_reference_nodes))
+        _, sum_value, _ = solver.get_solution(objects, capacity)
+        return sum_value, "branch_and_bound"
+
+    def __run_solver(self, solver_config: dict, objects: list[tuple[int, int]], capacity: int, seed: str) -> dict:
+        wall_times = []
+        for repeat in range(self.__number_of_repeats):
+            solver = self.__create_solver(solver_config, f"{seed}:{repeat}")
+            start_time = time.perf_counter()
+            result = solver.get_solution(objects, capacity)
+            wall_times.append(time.perf_counter() - start_time)
+
+        # Память измеряется отдельным запуском, так как tracemalloc замедляет выполнение
+        peak_memory = None
+        if self.__measure_memory:
+            solver = self.__create_solver(solver_config, f"{seed}:0")
+            tracemalloc.start()
+            try:
+                solver.get_solution(objects, capacity)
+                peak_memory = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        if solver_config["solver"] in GENETIC_SOLVERS:
+            result = result[0]
+        _, sum_value, sum_weight = result
+        wall_time = statistics.median(wall_times)
+        number_of_generations = self.__get_number_of_generations(solver)
+        generations_per_second = None
+        if number_of_generations is not None and wall_time > 0:
+            generations_per_second = number_of_generations / wall_time
+
+        return dict(wall_time=wall_time, min_wall_time=min(wall_times), number_of_generations=number_of_generations,
+                    generations_per_second=generations_per_second, peak_memory=peak_memory, value=sum_value,
+                    weight=sum_weight, is_feasible=sum_weight <= capacity)
+
+    def __create_solver(self, solver_config: dict, seed: str):
+        solver = create_solver(solver_config)
+        if isinstance(solver, BaseGenetic):
+            solver.rng = RandomStream(seed)
+        return solver
+
+    def __get_number_of_generations(self, solver) -> int:
+        # Число поколений известно заранее, только если запуск не может остановиться раньше
+        if not isinstance(solver, BaseGenetic):
+            return None
+        if solver.stop_if_without_changes or solver.time_limit is not None or solver.termination_criteria:
+            return None
+        return solver.number_of_iterations
+
+
+def get_gap(reference_value: float, value: float) -> float:
+    if not reference_value:
+        return 0.0
+    return (reference_value - value) / reference_value
+
+
+def get_environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).resolve().parent,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return dict(commit=commit, python_version=platform.python_version(), machine=platform.machine())
+
+
+def write_results(records: list[dict], path: str) -> None:
+    if Path(path).suffix == ".csv":
+        fieldnames = list(dict.fromkeys(name for record in records for name in record))
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=fieldnames, restval='')
+            writer.writeheader()
+            writer.writerows(records)
+    else:
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(records, file, indent=1)
+
+
+def print_record(record: dict) -> None:
+    print(f"{record['family']:>28} {record['number_of_objects']:>7} {record['solver']:>52} "
+          f"time {record['wall_time']:.4f}s gap {record['optimality_gap']:.4%}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark knapsack solvers on generated Pisinger instances")
+    parser.add_argument("--families", nargs="+", default=InstanceGenerator.FAMILIES, choices=InstanceGenerator.FAMILIES)
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--population", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--seed", default="0")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak memory run")
+    parser.add_argument("--output", nargs="+", default=["benchmark.json"], help="result files, .json or .csv")
+    arguments = parser.parse_args()
+
+    benchmark = KnapsackBenchmark(solver_configs=get_default_solver_configs(arguments.iterations, arguments.population),
+                                  families=tuple(arguments.families),
+                                  sizes=tuple(arguments.sizes),
+                                  number_of_repeats=arguments.repeats,
+                                  measure_memory=not arguments.no_memory,
+                                  seed=arguments.seed)
+    benchmark_records = benchmark.run(print_record)
+    for output_path in arguments.output:
+        write_results(benchmark_records, output_path)
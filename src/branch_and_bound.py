@@ -0,0 +1,105 @@
+from greedy import KnapsackGreedy
+from itertools import accumulate
+import bisect
+import time
+
+
+def get_dantzig_bound(prefix_values: list[float], prefix_weights: list[float], ratios: list[float],
+                      level: int, free_space: float) -> float:
+    # Граница Данцига: объекты начиная с level по убыванию удельной ценности, последний берется частично
+    last_fitting = bisect.bisect_right(prefix_weights, prefix_weights[level] + free_space) - 1
+    bound = prefix_values[last_fitting] - prefix_values[level]
+    if last_fitting < len(ratios):
+        remainder = free_space - (prefix_weights[last_fitting] - prefix_weights[level])
+        bound = bound + remainder * ratios[last_fitting]
+    return bound
+
+
+def get_upper_bound(objects: list[tuple[float, float]], capacity: float) -> float:
+    sorted_values = KnapsackGreedy().get_sorted_relative_values(objects)
+    prefix_values = [0] + list(accumulate(objects[i][0] for i, _ in sorted_values))
+    prefix_weights = [0] + list(accumulate(objects[i][1] for i, _ in sorted_values))
+    return get_dantzig_bound(prefix_values, prefix_weights, [ratio for _, ratio in sorted_values], 0, capacity)
+
+
+class KnapsackBranchAndBound:
+
+    # Время проверяется раз в столько узлов, чтобы не замедлять обход
+    TIME_CHECK_INTERVAL = 1024
+
+    def __init__(self, max_number_of_nodes: int = None, time_limit: float = None):
+        self.__max_number_of_nodes = max_number_of_nodes
+        self.__time_limit = time_limit
+
+    def get_solution(self, objects: list[tuple[float, float]], capacity: int) -> tuple[list[int], float, float]:
+        greedy_solver = KnapsackGreedy()
+        sorted_values = greedy_solver.get_sorted_relative_values(objects)
+        self.__order = [i for i, _ in sorted_values]
+        self.__ratios = [ratio for _, ratio in sorted_values]
+        self.__values = [objects[i][0] for i in self.__order]
+        self.__weights = [objects[i][1] for i in self.__order]
+        self.__prefix_values = [0] + list(accumulate(self.__values))
+        self.__prefix_weights = [0] + list(accumulate(self.__weights))
+        self.__capacity = capacity
+        self.__start_time = time.perf_counter()
+
+        # Жадное решение - начальная нижняя граница
+        greedy_presence, best_value, _ = greedy_solver.get_solution(objects, capacity)
+        best_decisions = [greedy_presence[i] for i in self.__order]
+        best_decisions, best_value = self.__search(best_decisions, best_value)
+
+        objects_presence = [0] * len(objects)
+        for position, decision in enumerate(best_decisions):
+            objects_presence[self.__order[position]] = decision
+        sum_value = sum(value for (value, _), presence in zip(objects, objects_presence) if presence)
+        sum_weight = sum(weight for (_, weight), presence in zip(objects, objects_presence) if presence)
+        return objects_presence, sum_value, sum_weight
+
+    def __search(self, best_decisions: list[int], best_value: float) -> tuple[list[int], float]:
+        number_of_objects = len(self.__values)
+        decisions = []
+        # Узел: (уровень, ценность, вес, решение на предыдущем уровне). Ветка "взять" кладется
+        # в стек последней, поэтому обход в глубину сначала идет по жадному пути
+        stack = [(0, 0, 0, None)]
+        number_of_nodes = 0
+
+        while stack:
+            level, sum_value, sum_weight, decision = stack.pop()
+            del decisions[max(level - 1, 0):]
+            if decision is not None:
+                decisions.append(decision)
+
+            number_of_nodes = number_of_nodes + 1
+            if self.__max_number_of_nodes is not None and number_of_nodes > self.__max_number_of_nodes:
+                break
+            # При остановке по лимиту возвращается лучшее найденное решение, оно не хуже жадного
+            if (self.__time_limit is not None and number_of_nodes % self.TIME_CHECK_INTERVAL == 0
+                    and time.perf_counter() - self.__start_time >= self.__time_limit):
+                break
+
+            if level == number_of_objects:
+                if sum_value > best_value:
+                    best_value = sum_value
+                    best_decisions = decisions.copy()
+                continue
+
+            if self.__get_upper_bound(level, sum_value, sum_weight) <= best_value:
+                continue
+
+            stack.append((level + 1, sum_value, sum_weight, 0))
+            new_weight = sum_weight + self.__weights[level]
+            if new_weight <= self.__capacity:
+                stack.append((level + 1, sum_value + self.__values[level], new_weight, 1))
+
+        return best_decisions, best_value
+
+    def __get_upper_bound(self, level: int, sum_value: float, sum_weight: float) -> float:
+        return sum_value + get_dantzig_bound(self.__prefix_values, self.__prefix_weights, self.__ratios,
+                                             level, self.__capacity - sum_weight)
+
+    def solution_to_string(self, solution: tuple[list[int], float, float]) -> str:
+        objects_presence, sum_value, sum_weight = solution
+        result = (f"\nBranch and bound results\n"
+                  f"Objects: {objects_presence}\n"
+                  f"Sum value: {sum_value} Sum weight: {sum_weight}")
+        return result
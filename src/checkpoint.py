@@ -0,0 +1,176 @@
+from array import array
+import json
+import os
+import struct
+import sys
+
+
+# Формат файла: заголовок, метаданные в JSON (счетчики и состояние генераторов),
+# геномы по одному биту на ген (ген i - бит i & 7 байта i >> 3), затем оценки float64
+CHECKPOINT_MAGIC = b"KNAPCKPT"
+CHECKPOINT_VERSION = 1
+CHECKPOINT_HEADER = struct.Struct("<8sHxxIIQ")
+
+
+class Checkpoint:
+
+    def __init__(self,
+                 number_of_objects: int,
+                 packed_genomes: list[bytes],
+                 fitness_scores: list[float],
+                 iteration: int = 0,
+                 current_best_result_iteration: int = 0,
+                 iterations_without_changes: int = 0,
+                 random_state: tuple = None,
+                 numpy_random_state: dict = None
+                 ):
+        self.__number_of_objects = number_of_objects
+        self.__packed_genomes = packed_genomes
+        self.__fitness_scores = fitness_scores
+        self.__iteration = iteration
+        self.__current_best_result_iteration = current_best_result_iteration
+        self.__iterations_without_changes = iterations_without_changes
+        self.__random_state = random_state
+        self.__numpy_random_state = numpy_random_state
+
+    @property
+    def number_of_objects(self):
+        return self.__number_of_objects
+
+    @property
+    def packed_genomes(self):
+        return self.__packed_genomes
+
+    @property
+    def fitness_scores(self):
+        return self.__fitness_scores
+
+    @property
+    def iteration(self):
+        return self.__iteration
+
+    @property
+    def current_best_result_iteration(self):
+        return self.__current_best_result_iteration
+
+    @property
+    def iterations_without_changes(self):
+        return self.__iterations_without_changes
+
+    @property
+    def random_state(self):
+        return self.__random_state
+
+    @property
+    def numpy_random_state(self):
+        return self.__numpy_random_state
+
+    def save(self, path: str) -> None:
+        metadata = dict(iteration=self.__iteration,
+                        current_best_result_iteration=self.__current_best_result_iteration,
+                        iterations_without_changes=self.__iterations_without_changes,
+                        random_state=self.__random_state,
+                        numpy_random_state=self.__numpy_random_state)
+        encoded_metadata = json.dumps(metadata).encode()
+        fitness_scores = array('d', self.__fitness_scores)
+        if sys.byteorder != 'little':
+            fitness_scores.byteswap()
+
+        # Файл пишется рядом и подменяется целиком, поэтому прерванная запись не портит прошлую точку
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, 'wb') as file:
+            file.write(CHECKPOINT_HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION, len(self.__packed_genomes),
+                                              self.__number_of_objects, len(encoded_metadata)))
+            file.write(encoded_metadata)
+            file.write(b"".join(self.__packed_genomes))
+            file.write(fitness_scores.tobytes())
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, path)
+
+    @staticmethod
+    def load(path: str) -> "Checkpoint":
+        with open(path, 'rb') as file:
+            data = file.read()
+
+        magic, version, size_of_population, number_of_objects, metadata_length = CHECKPOINT_HEADER.unpack_from(data)
+        if magic != CHECKPOINT_MAGIC or version != CHECKPOINT_VERSION:
+            raise ValueError(f"{path} is not a genetic algorithm checkpoint")
+        position = CHECKPOINT_HEADER.size
+        metadata = json.loads(data[position:position + metadata_length])
+        position = position + metadata_length
+
+        number_of_bytes = (number_of_objects + 7) // 8
+        packed_genomes = [data[position + i * number_of_bytes:position + (i + 1) * number_of_bytes]
+                          for i in range(size_of_population)]
+        position = position + size_of_population * number_of_bytes
+        fitness_scores = array('d', data[position:position + size_of_population * 8])
+        if sys.byteorder != 'little':
+            fitness_scores.byteswap()
+
+        random_state = metadata["random_state"]
+        if random_state is not None:
+            # JSON превращает кортежи состояния random.Random в списки
+            random_state = (random_state[0], tuple(random_state[1]), random_state[2])
+        return Checkpoint(number_of_objects, packed_genomes, fitness_scores.tolist(),
+                          metadata["iteration"], metadata["current_best_result_iteration"],
+                          metadata["iterations_without_changes"], random_state, metadata["numpy_random_state"])
+
+
+class CheckpointManager:
+
+    def __init__(self, genetic_task):
+        self.__genetic_task = genetic_task
+
+    def get_resume_checkpoint(self) -> Checkpoint:
+        checkpoint = self.__genetic_task.initial_checkpoint
+        if checkpoint is None or not self.__genetic_task.resume_from_checkpoint:
+            return None
+
+        if checkpoint.random_state is not None:
+            self.__genetic_task.random_stream.setstate(checkpoint.random_state)
+        random_generator = getattr(self.__genetic_task, "random_generator", None)
+        if checkpoint.numpy_random_state is not None and random_generator is not None:
+            random_generator.bit_generator.state = checkpoint.numpy_random_state
+        return checkpoint
+
+    def on_generation(self, iteration: int, current_best_result_iteration: int, iterations_without_changes: int,
+                      population, fitness_scores) -> None:
+        checkpoint_interval = self.__genetic_task.checkpoint_interval
+        if self.__genetic_task.checkpoint_path is not None and checkpoint_interval and iteration % checkpoint_interval == 0:
+            checkpoint = self.__get_checkpoint(iteration, current_best_result_iteration, iterations_without_changes,
+                                               population, fitness_scores)
+            checkpoint.save(self.__genetic_task.checkpoint_path)
+
+    def finish(self, iteration: int, current_best_result_iteration: int, iterations_without_changes: int,
+               population, fitness_scores) -> None:
+        if self.__genetic_task.checkpoint_path is None and not self.__genetic_task.keep_final_checkpoint:
+            return
+        checkpoint = self.__get_checkpoint(iteration, current_best_result_iteration, iterations_without_changes,
+                                           population, fitness_scores)
+        if self.__genetic_task.checkpoint_path is not None:
+            checkpoint.save(self.__genetic_task.checkpoint_path)
+        if self.__genetic_task.keep_final_checkpoint:
+            self.__genetic_task.final_checkpoint = checkpoint
+
+    def __get_checkpoint(self, iteration: int, current_best_result_iteration: int, iterations_without_changes: int,
+                         population, fitness_scores) -> Checkpoint:
+        random_generator = getattr(self.__genetic_task, "random_generator", None)
+        numpy_random_state = random_generator.bit_generator.state if random_generator is not None else None
+        packed_genomes = self.__genetic_task.pack_population(population)
+        return Checkpoint(self.__genetic_task.number_of_objects, packed_genomes,
+                          [float(score) for score in fitness_scores], iteration,
+                          current_best_result_iteration, iterations_without_changes,
+                          self.__genetic_task.random_stream.getstate(), numpy_random_state)
+
+
+def pack_genes(genes: list[int]) -> bytes:
+    number_of_bytes = (len(genes) + 7) // 8
+    bits = "".join("1" if gene else "0" for gene in reversed(genes))
+    return int(bits or "0", 2).to_bytes(number_of_bytes, 'little')
+
+
+def unpack_genes(packed_genes: bytes, number_of_objects: int) -> list[int]:
+    # Если число объектов изменилось, лишние гены отбрасываются, а недостающие равны нулю
+    bits = format(int.from_bytes(packed_genes, 'little'), f'0{number_of_objects}b')
+    return [int(bit) for bit in reversed(bits)][:number_of_objects]
@@ -0,0 +1,186 @@
+from abc import ABC, abstractmethod
+from collections import deque
+import math
+import threading
+import time
+
+
+class PopulationDiversity:
+
+    def __init__(self, diversity_measure: str = "gene_entropy"):
+        self.__diversity_measure = getattr(self, "_PopulationDiversity__" + diversity_measure)
+
+    def get_diversity(self, gene_frequencies: list[float], size_of_population: int) -> float:
+        if not gene_frequencies:
+            return 0.0
+        return self.__diversity_measure(gene_frequencies, size_of_population)
+
+    # Меры разнообразия, обе нормированы на отрезок [0, 1]
+
+    def __gene_entropy(self, gene_frequencies: list[float], size_of_population: int) -> float:
+        sum_entropy = 0.0
+        for frequency in gene_frequencies:
+            if 0 < frequency < 1:
+                sum_entropy = sum_entropy - frequency * math.log2(frequency) - (1 - frequency) * math.log2(1 - frequency)
+        return sum_entropy / len(gene_frequencies)
+
+    def __hamming_distance(self, gene_frequencies: list[float], size_of_population: int) -> float:
+        # Средняя попарная хэммингова дистанция выражается через частоты генов:
+        # по гену i различаются c * (P - c) пар из P * (P - 1) / 2, в среднем не больше половины пар
+        if size_of_population < 2:
+            return 0.0
+        pairs_factor = 2 * size_of_population / (size_of_population - 1)
+        mean_distance = sum(frequency * (1 - frequency) for frequency in gene_frequencies) * pairs_factor
+        return min(2 * mean_distance / len(gene_frequencies), 1.0)
+
+
+class TerminationCriterion(ABC):
+    requires_diversity = False
+
+    def start(self) -> None:
+        pass
+
+    @abstractmethod
+    def should_stop(self, iteration: int, best_fitness: float, diversity: float, elapsed_time: float) -> bool:
+        pass
+
+
+class DiversityCriterion(TerminationCriterion):
+    requires_diversity = True
+
+    def __init__(self, min_diversity: float):
+        self.__min_diversity = min_diversity
+
+    def should_stop(self, iteration: int, best_fitness: float, diversity: float, elapsed_time: float) -> bool:
+        return diversity is not None and diversity < self.__min_diversity
+
+
+class ImprovementCriterion(TerminationCriterion):
+
+    def __init__(self, window: int, epsilon: float = 0.0):
+        self.__window = window
+        self.__epsilon = epsilon
+
+    def start(self) -> None:
+        self.__best_fitness_values = deque(maxlen=self.__window + 1)
+        self.__best_fitness = -math.inf
+
+    def should_stop(self, iteration: int, best_fitness: float, diversity: float, elapsed_time: float) -> bool:
+        self.__best_fitness = max(self.__best_fitness, best_fitness)
+        self.__best_fitness_values.append(self.__best_fitness)
+        if len(self.__best_fitness_values) <= self.__window:
+            return False
+        return self.__best_fitness_values[-1] - self.__best_fitness_values[0] <= self.__epsilon
+
+
+class TimeLimitCriterion(TerminationCriterion):
+
+    def __init__(self, time_limit: float):
+        self.__time_limit = time_limit
+
+    def should_stop(self, iteration: int, best_fitness: float, diversity: float, elapsed_time: float) -> bool:
+        return elapsed_time >= self.__time_limit
+
+
+class TargetValueCriterion(TerminationCriterion):
+
+    def __init__(self, target_value: float, tolerance: float = 1e-9):
+        self.__target_value = target_value
+        self.__tolerance = tolerance
+
+    def should_stop(self, iteration: int, best_fitness: float, diversity: float, elapsed_time: float) -> bool:
+        return best_fitness >= self.__target_value - self.__tolerance
+
+
+class CancellationCriterion(TerminationCriterion):
+
+    def __init__(self, deadline: float = None):
+        # Срок задается по часам time.monotonic, как и у цикла событий asyncio
+        self.__deadline = deadline
+        self.__cancel_event = threading.Event()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self.__cancel_event.is_set()
+
+    def cancel(self) -> None:
+        # Вызывается из другого потока, алгоритм остановится в конце текущего поколения
+        self.__cancel_event.set()
+
+    def should_stop(self, iteration: int, best_fitness: float, diversity: float, elapsed_time: float) -> bool:
+        if self.__deadline is not None and time.monotonic() >= self.__deadline:
+            return True
+        return self.__cancel_event.is_set()
+
+
+class AdaptiveOperatorRates:
+
+    def __init__(self,
+                 min_diversity: float = 0.05,
+                 max_diversity: float = 0.5,
+                 min_crossover_probability: float = 0.6,
+                 max_crossover_probability: float = 0.95,
+                 min_mutation_probability: float = 0.001,
+                 max_mutation_probability: float = 0.1
+                 ):
+        self.__min_diversity = min_diversity
+        self.__max_diversity = max_diversity
+        self.__min_crossover_probability = min_crossover_probability
+        self.__max_crossover_probability = max_crossover_probability
+        self.__min_mutation_probability = min_mutation_probability
+        self.__max_mutation_probability = max_mutation_probability
+
+    def get_rates(self, diversity: float) -> tuple[float, float]:
+        # Чем меньше разнообразие, тем чаще мутации и реже скрещивание
+        position = (diversity - self.__min_diversity) / (self.__max_diversity - self.__min_diversity)
+        position = min(max(position, 0.0), 1.0)
+        crossover_probability = self.__min_crossover_probability + position * (
+                self.__max_crossover_probability - self.__min_crossover_probability)
+        mutation_probability = self.__max_mutation_probability - position * (
+                self.__max_mutation_probability - self.__min_mutation_probability)
+        return crossover_probability, mutation_probability
+
+
+class ConvergenceMonitor:
+
+    def __init__(self, genetic_task):
+        self.__genetic_task = genetic_task
+        self.__diversity = PopulationDiversity(genetic_task.diversity_measure)
+        self.__termination_criteria = list(genetic_task.termination_criteria or [])
+        if genetic_task.time_limit is not None:
+            self.__termination_criteria.append(TimeLimitCriterion(genetic_task.time_limit))
+        self.__is_diversity_required = genetic_task.adaptive_operator_rates is not None or bool(
+            genetic_task.metrics_hooks) or any(criterion.requires_diversity for criterion in self.__termination_criteria)
+
+    def start(self) -> None:
+        self.__start_time = time.perf_counter()
+        self.__initial_crossover_probability = self.__genetic_task.crossover_probability
+        if self.__genetic_task.adaptive_operator_rates is not None:
+            self.__initial_mutation_probability = self.__genetic_task.mutation_probability
+        for criterion in self.__termination_criteria:
+            criterion.start()
+
+    def finish(self) -> None:
+        # Адаптивные вероятности меняют настройки задачи только на время одного запуска
+        if self.__genetic_task.adaptive_operator_rates is not None:
+            self.__genetic_task.crossover_probability = self.__initial_crossover_probability
+            self.__genetic_task.mutation_probability = self.__initial_mutation_probability
+
+    def update_diversity(self, iteration: int, population) -> float:
+        self.__diversity_value = None
+        if self.__is_diversity_required and iteration % self.__genetic_task.diversity_check_interval == 0:
+            gene_frequencies = self.__genetic_task.gene_frequencies_function(population)
+            self.__diversity_value = self.__diversity.get_diversity(gene_frequencies, len(population))
+            adaptive_operator_rates = self.__genetic_task.adaptive_operator_rates
+            if adaptive_operator_rates is not None:
+                crossover_probability, mutation_probability = adaptive_operator_rates.get_rates(self.__diversity_value)
+                self.__genetic_task.crossover_probability = crossover_probability
+                self.__genetic_task.mutation_probability = mutation_probability
+        return self.__diversity_value
+
+    def is_terminated(self, iteration: int, best_fitness: float) -> bool:
+        elapsed_time = time.perf_counter() - self.__start_time
+        # Все критерии опрашиваются на каждой итерации, так как некоторые из них накапливают историю
+        stop_flags = [criterion.should_stop(iteration, best_fitness, self.__diversity_value, elapsed_time)
+                      for criterion in self.__termination_criteria]
+        return any(stop_flags)
@@ -0,0 +1,90 @@
+import numpy as np
+
+
+def get_integer_weights(objects: list[tuple[float, float]], capacity: int) -> list[int]:
+    weights = []
+    for _, weight in objects:
+        if weight < 0 or not float(weight).is_integer():
+            raise ValueError("Dynamic programming requires non-negative integer weights")
+        weights.append(int(weight))
+    if capacity < 0 or not float(capacity).is_integer():
+        raise ValueError("Dynamic programming requires a non-negative integer capacity")
+    return weights
+
+
+class KnapsackDP:
+
+    def get_solution(self, objects: list[tuple[float, float]], capacity: int) -> tuple[list[int], float, float]:
+        weights = get_integer_weights(objects, capacity)
+        capacity = int(capacity)
+        values = [value for value, _ in objects]
+        if all(value == weight for value, weight in zip(values, weights)):
+            return self.__get_bitset_solution(objects, weights, capacity)
+        decisions = self.__get_decisions(values, weights, capacity)
+        result = self.__get_dp_solution(objects, weights, decisions, capacity)
+        return result
+
+    def __get_bitset_solution(self, objects: list[tuple[float, float]], weights: list[int],
+                              capacity: int) -> tuple[list[int], float, float]:
+        # Если ценность равна весу, лучшая ценность - наибольший достижимый вес. Множество достижимых весов
+        # хранится битами одного целого числа, объект добавляется сдвигом и OR сразу для всех вместимостей
+        capacity_mask = (1 << (capacity + 1)) - 1
+        reachable = 1
+        reachable_before = []
+        for weight in weights:
+            if reachable >> capacity & 1:
+                break
+            reachable_before.append(reachable)
+            reachable = reachable | (reachable << weight) & capacity_mask
+
+        # Вес, недостижимый без объекта i, требует этого объекта
+        objects_presence = [0] * len(objects)
+        sum_value = 0
+        target_weight = reachable.bit_length() - 1
+        for i in reversed(range(len(reachable_before))):
+            if not reachable_before[i] >> target_weight & 1:
+                objects_presence[i] = 1
+                sum_value = sum_value + objects[i][0]
+                target_weight = target_weight - weights[i]
+
+        return objects_presence, sum_value, reachable.bit_length() - 1
+
+    def __get_decisions(self, values: list[float], weights: list[int], capacity: int) -> list[np.ndarray]:
+        # Одномерный массив лучших ценностей по вместимости обновляется на месте для каждого объекта,
+        # а для восстановления ответа хранятся только упакованные биты решений "брать / не брать"
+        best_values = np.zeros(capacity + 1, dtype=np.float64)
+        decisions = []
+        for value, weight in zip(values, weights):
+            if weight > capacity or value <= 0:
+                decisions.append(None)
+                continue
+            candidate_values = best_values[:capacity + 1 - weight] + value
+            take = candidate_values > best_values[weight:]
+            best_values[weight:] = np.where(take, candidate_values, best_values[weight:])
+            decisions.append(np.packbits(take))
+        return decisions
+
+    def __get_dp_solution(self, objects: list[tuple[float, float]], weights: list[int], decisions: list[np.ndarray],
+                          capacity: int) -> tuple[list[int], float, float]:
+        objects_presence = [0] * len(objects)
+        sum_value = 0
+        free_space = capacity
+        for i in reversed(range(len(objects))):
+            weight = weights[i]
+            if decisions[i] is None or free_space < weight:
+                continue
+            bit_index = free_space - weight
+            if decisions[i][bit_index >> 3] >> (7 - (bit_index & 7)) & 1:
+                objects_presence[i] = 1
+                sum_value = sum_value + objects[i][0]
+                free_space = free_space - weight
+
+        sum_weight = capacity - free_space
+        return objects_presence, sum_value, sum_weight
+
+    def solution_to_string(self, solution: tuple[list[int], float, float]) -> str:
+        objects_presence, sum_value, sum_weight = solution
+        result = (f"\nDynamic programming results\n"
+                  f"Objects: {objects_presence}\n"
+                  f"Sum value: {sum_value} Sum weight: {sum_weight}")
+        return result
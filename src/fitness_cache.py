@@ -0,0 +1,88 @@
+from collections import OrderedDict
+import random
+import sys
+
+
+# Ключи Зобриста не зависят от генератора алгоритма, поэтому их построение не расходует его случайные числа
+ZOBRIST_SEED = 0
+# Узел OrderedDict, его доля в хеш-таблице и пара (значение, размер), в которой хранится запись
+ENTRY_OVERHEAD = 160
+
+
+class FitnessCache:
+
+    def __init__(self, max_number_of_entries: int = None, max_number_of_bytes: int = None):
+        self.__max_number_of_entries = max_number_of_entries
+        self.__max_number_of_bytes = max_number_of_bytes
+        self.__entries = OrderedDict()
+        self.__number_of_bytes = 0
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def hits(self):
+        return self.__hits
+
+    @property
+    def misses(self):
+        return self.__misses
+
+    @property
+    def number_of_bytes(self):
+        return self.__number_of_bytes
+
+    def __len__(self):
+        return len(self.__entries)
+
+    @staticmethod
+    def get_zobrist_keys(number_of_genes: int) -> list[int]:
+        # Хеш генома - XOR ключей включенных генов, поэтому изменение одного гена обновляет его за O(1)
+        generator = random.Random(ZOBRIST_SEED)
+        return [generator.getrandbits(64) for _ in range(number_of_genes)]
+
+    def get(self, key: int, is_counted: bool = True):
+        # Счетчики попаданий учитывают только обращения, которые заменяют оценку особи
+        entry = self.__entries.get(key)
+        if entry is None:
+            if is_counted:
+                self.__misses = self.__misses + 1
+            return None
+        if is_counted:
+            self.__hits = self.__hits + 1
+        self.__entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: int, value) -> None:
+        entry_size = self.__get_entry_size(key, value)
+        previous_entry = self.__entries.pop(key, None)
+        if previous_entry is not None:
+            self.__number_of_bytes = self.__number_of_bytes - previous_entry[1]
+        self.__entries[key] = (value, entry_size)
+        self.__number_of_bytes = self.__number_of_bytes + entry_size
+        self.__evict()
+
+    def clear(self) -> None:
+        self.__entries.clear()
+        self.__number_of_bytes = 0
+        self.__hits = 0
+        self.__misses = 0
+
+    @staticmethod
+    def __get_entry_size(key: int, value) -> int:
+        # Элементы кортежа считаются отдельно: getsizeof кортежа учитывает только ссылки на них
+        entry_size = ENTRY_OVERHEAD + sys.getsizeof(key) + sys.getsizeof(value)
+        if isinstance(value, tuple):
+            entry_size = entry_size + sum(sys.getsizeof(item) for item in value)
+        return entry_size
+
+    def __evict(self) -> None:
+        while self.__entries and self.__is_overflowed():
+            _, (_, entry_size) = self.__entries.popitem(last=False)
+            self.__number_of_bytes = self.__number_of_bytes - entry_size
+
+    def __is_overflowed(self) -> bool:
+        if self.__max_number_of_entries is not None and len(self.__entries) > self.__max_number_of_entries:
+            return True
+        if self.__max_number_of_bytes is not None and self.__number_of_bytes > self.__max_number_of_bytes:
+            return True
+        return False
@@ -1,6 +1,13 @@
 from genetic_core import GeneticCore, BaseGenetic
 from greedy import KnapsackGreedy
-import random
+from individual import Individual
+from fitness_cache import FitnessCache
+from local_search import LocalSearch
+from checkpoint import pack_genes, unpack_genes
+from functools import reduce
+from itertools import compress
+import operator
+import time
 
 
 class KnapsackGenetic(BaseGenetic):
@@ -10,45 +17,56 @@ class KnapsackGenetic(BaseGenetic):
                  fitness_evaluation_function,
                  crossover_function,
                  mutation_function,
-                 number_of_random_initial_individuals: int = 50,
-                 number_of_greedy_initial_individuals: int = 0,
-                 crossover_probability: float = 0.85,
-                 mutation_probability: float = 0.1,
-                 number_of_iterations: int = 2000,
-                 stop_if_without_changes: bool = False,
-                 number_of_iterations_without_changes: int = 50,
-                 use_elitism: bool = True,
-                 use_visualization: bool = False,
-                 use_correction_after_each_step: bool = False
+                 correction_function: str = "greedy_correction",
+                 fitness_cache_max_entries: int = None,
+                 fitness_cache_max_bytes: int = None,
+                 **kwargs
                  ):
-        super().__init__(
-            crossover_probability=crossover_probability,
-            number_of_iterations=number_of_iterations,
-            stop_if_without_changes=stop_if_without_changes,
-            number_of_iterations_without_changes=number_of_iterations_without_changes,
-            use_elitism=use_elitism,
-            use_visualization=use_visualization
-        )
+        super().__init__(**kwargs)
         self.__initial_population_function = getattr(self, "_KnapsackGenetic__" + initial_population_function)
         self.__fitness_evaluation_function = getattr(self, "_KnapsackGenetic__" + fitness_evaluation_function)
         self.__crossover_function = getattr(self, "_KnapsackGenetic__" + crossover_function)
         self.__mutation_function = getattr(self, "_KnapsackGenetic__" + mutation_function)
+        self.__correction_function = getattr(self, "_KnapsackGenetic__" + correction_function)
 
-        self.__number_of_random_initial_individuals = number_of_random_initial_individuals
-        self.__number_of_greedy_initial_individuals = number_of_greedy_initial_individuals
-        self.__mutation_probability = mutation_probability
-        self.__use_correction_after_each_step = use_correction_after_each_step
+        self.__fitness_cache = None
+        if fitness_cache_max_entries is not None or fitness_cache_max_bytes is not None:
+            self.__fitness_cache = FitnessCache(fitness_cache_max_entries, fitness_cache_max_bytes)
+        # Случайная коррекция расходует числа генератора, а попадание в кеш пропустило бы их и изменило ход эволюции,
+        # поэтому исправленные геномы кешируются только при детерминированной коррекции
+        self.__is_correction_cached = correction_function != "random_correction"
 
-    def get_solution(self, objects: list[tuple[float, float]], capacity: int) -> tuple[tuple[list[int], float, float], int]:
+    @property
+    def fitness_cache(self):
+        return self.__fitness_cache
+
+    def get_solution(self, objects: list[tuple[float, float]], capacity: int,
+                     genetic_core: GeneticCore = None) -> tuple[tuple[list[int], float, float], int]:
         self.__objects=objects
         self.__capacity=capacity
         self.__number_of_objects = len(objects)
-        genetic_core = GeneticCore()
+        self.reset_random_stream()
+        if self.sorted_indexes is not None:
+            self.__sorted_indexes = self.sorted_indexes
+        else:
+            self.__sorted_indexes = [i for i, _ in KnapsackGreedy().get_sorted_relative_values(objects)]
+        if self.use_local_search:
+            self.__local_search = LocalSearch([value for value, _ in objects], [weight for _, weight in objects],
+                                              capacity, self.__sorted_indexes, self.local_search_max_moves)
+        self.__correction_time = 0.0
+        self.__zobrist_keys = None
+        if self.__fitness_cache is not None:
+            self.__fitness_cache.clear()
+            self.__zobrist_keys = FitnessCache.get_zobrist_keys(self.__number_of_objects)
+            # Ключ коррекции отличается от ключа оценки того же генома постоянной маской
+            self.__correction_key_mask = FitnessCache.get_zobrist_keys(self.__number_of_objects + 1)[-1]
+        if genetic_core is None:
+            genetic_core = GeneticCore()
         best_individual, iterations_count = genetic_core.get_best_individual(self)
-        result = self.__get_solution_from_best_individual(best_individual)
+        result = self.get_solution_from_individual(best_individual)
         return result, iterations_count
 
-    def __get_solution_from_best_individual(self, best_individual: list[int]) -> tuple[list[int], float, float]:
+    def get_solution_from_individual(self, best_individual: list[int]) -> tuple[list[int], float, float]:
         sum_value = 0
         sum_weight = 0
         for i, presence in enumerate(best_individual):
@@ -56,7 +74,18 @@ class KnapsackGenetic(BaseGenetic):
                 current_value, current_weight = self.__objects[i]
                 sum_value = sum_value + current_value
                 sum_weight = sum_weight + current_weight
-        return best_individual, sum_value, sum_weight
+        return list(best_individual), sum_value, sum_weight
+
+    @property
+    def number_of_objects(self):
+        return self.__number_of_objects
+
+    def get_statistics(self) -> dict:
+        statistics = {"correction_time": self.__correction_time}
+        if self.__fitness_cache is not None:
+            statistics["cache_hits"] = self.__fitness_cache.hits
+            statistics["cache_misses"] = self.__fitness_cache.misses
+        return statistics
 
     # Функции начальной инициализации
 
@@ -65,77 +94,132 @@ class KnapsackGenetic(BaseGenetic):
 
     def __get_initial_population(self) -> list[list[int]]:
         initial_population = []
-        if self.__number_of_random_initial_individuals > 0:
-            for _ in range(self.__number_of_random_initial_individuals):
-                new_individual = [random.randint(0, 1) for _ in range(self.__number_of_objects)]
+        if self.number_of_random_initial_individuals > 0:
+            for _ in range(self.number_of_random_initial_individuals):
+                new_individual = self.__get_individual_with_totals(self.random_stream.choices((0, 1), k=self.__number_of_objects))
                 initial_population.append(new_individual)
-        if self.__number_of_greedy_initial_individuals > 0:
-            greedy_solver = KnapsackGreedy()
-            new_individual = greedy_solver.get_solution(self.__objects, self.__capacity)[0]
-            for _ in range(self.__number_of_greedy_initial_individuals):
+        if self.number_of_greedy_initial_individuals > 0:
+            new_individual = Individual(*self.seeding_solver.get_solution(self.__objects, self.__capacity))
+            for _ in range(self.number_of_greedy_initial_individuals):
                 initial_population.append(new_individual)
 
         return initial_population
 
+    def __get_initial_population_from_checkpoint(self) -> list[Individual]:
+        return self.unpack_population(self.initial_checkpoint.packed_genomes)
+
     # Фитнесс функции
 
     def fitness_evaluation_function(self, population):
+        if self.__fitness_cache is not None:
+            return self.__cached_fitness_evaluation(population)
         return self.__fitness_evaluation_function(population)
 
-    def __simple_fitness_evaluation(self, population: list[list[int]]) -> list[float]:
+    def __cached_fitness_evaluation(self, population: list[Individual]) -> list[float]:
+        # Каждая особь - ровно одно обращение к кешу. Промах оценивается сразу и записывается,
+        # поэтому повторы генома в том же поколении уже попадают в кеш, если его запись разрешена
+        fitness_scores = []
+        for individual in population:
+            self.__update_totals(individual)
+            key = individual.genome_hash
+            entry = self.__fitness_cache.get(key)
+            if entry is None:
+                score = self.__fitness_evaluation_function([individual])[0]
+                corrected_genes = bytes(individual) if individual.genome_hash != key else None
+                if corrected_genes is None or self.__is_correction_cached:
+                    entry = (score, corrected_genes, individual.sum_value, individual.sum_weight, individual.genome_hash)
+                    self.__fitness_cache.put(key, entry)
+                fitness_scores.append(score)
+            else:
+                fitness_scores.append(self.__apply_cache_entry(individual, entry))
+
+        return fitness_scores
+
+    def __apply_cache_entry(self, individual: Individual, entry: tuple) -> float:
+        score, corrected_genes, sum_value, sum_weight, genome_hash = entry
+        if corrected_genes is not None:
+            individual[:] = corrected_genes
+        individual.sum_value = sum_value
+        individual.sum_weight = sum_weight
+        individual.genome_hash = genome_hash
+        return score
+
+    def __simple_fitness_evaluation(self, population: list[Individual]) -> list[float]:
         fitness_scores = []
         for individual in population:
-            scores = 0
-            free_space = self.__capacity
-            for i, presence in enumerate(individual):
-                if presence:
-                    current_value, current_weight = self.__objects[i]
-                    scores = scores + current_value
-                    free_space = free_space - current_weight
-                    if free_space < 0:
-                        scores = 0
-                        break
-
-            fitness_scores.append(scores)
+            self.__update_totals(individual)
+            if individual.sum_weight > self.__capacity:
+                fitness_scores.append(0)
+            else:
+                fitness_scores.append(individual.sum_value)
 
         return fitness_scores
 
-    def __fitness_evaluation_without_zeroing_out(self, population: list[list[int]]) -> list[float]:
+    def __fitness_evaluation_without_zeroing_out(self, population: list[Individual]) -> list[float]:
         fitness_scores = []
         for individual in population:
             self.__individual_correction(individual)
-            sum_value = sum(y[0] for x, y in zip(individual, self.__objects) if x == 1)
-            fitness_scores.append(sum_value)
+            fitness_scores.append(individual.sum_value)
 
         return fitness_scores
 
     # Функции скрещивания
     def crossover_function(self, first_parent, second_parent):
-        if self.__use_correction_after_each_step:
+        if self.use_correction_after_each_step:
             return self.__crossover_with_correction(first_parent, second_parent)
         else:
             return self.__crossover_function(first_parent, second_parent)
 
-    def __single_point_crossover(self, first_parent: list[int], second_parent:list[int]) -> tuple[list[int], list[int]]:
-        crossover_point = random.randint(0, len(first_parent) - 1)
-
-        first_child = first_parent[:crossover_point] + second_parent[crossover_point:]
-        second_child = second_parent[:crossover_point] + first_parent[crossover_point:]
+    def __single_point_crossover(self, first_parent: Individual, second_parent: Individual) -> tuple[Individual, Individual]:
+        crossover_point = self.random_stream.randint(0, len(first_parent) - 1)
+
+        first_child = Individual(first_parent[:crossover_point] + second_parent[crossover_point:])
+        second_child = Individual(second_parent[:crossover_point] + first_parent[crossover_point:])
+
+        # Суммы детей получаются из сумм родителей обменом хвостов,
+        # сами хвосты считаются по более короткой части генома
+        self.__update_totals(first_parent)
+        self.__update_totals(second_parent)
+        if crossover_point < len(first_parent) - crossover_point:
+            first_value, first_weight = self.__get_segment_totals(first_parent, 0, crossover_point)
+            second_value, second_weight = self.__get_segment_totals(second_parent, 0, crossover_point)
+            first_tail_value, first_tail_weight = first_parent.sum_value - first_value, first_parent.sum_weight - first_weight
+            second_tail_value, second_tail_weight = second_parent.sum_value - second_value, second_parent.sum_weight - second_weight
+        else:
+            first_tail_value, first_tail_weight = self.__get_segment_totals(first_parent, crossover_point, len(first_parent))
+            second_tail_value, second_tail_weight = self.__get_segment_totals(second_parent, crossover_point, len(second_parent))
+
+        first_child.sum_value = first_parent.sum_value - first_tail_value + second_tail_value
+        first_child.sum_weight = first_parent.sum_weight - first_tail_weight + second_tail_weight
+        second_child.sum_value = second_parent.sum_value - second_tail_value + first_tail_value
+        second_child.sum_weight = second_parent.sum_weight - second_tail_weight + first_tail_weight
+
+        if self.__zobrist_keys is not None:
+            # Дети отличаются от родителей хвостом, поэтому хеш меняется на XOR ключей, различающихся в хвосте генов.
+            # XOR по всему геному - это XOR хешей родителей, так что считается только более короткая часть
+            if crossover_point < len(first_parent) - crossover_point:
+                tail_hash = (first_parent.genome_hash ^ second_parent.genome_hash
+                             ^ self.__get_difference_hash(first_parent, second_parent, 0, crossover_point))
+            else:
+                tail_hash = self.__get_difference_hash(first_parent, second_parent, crossover_point, len(first_parent))
+            first_child.genome_hash = first_parent.genome_hash ^ tail_hash
+            second_child.genome_hash = second_parent.genome_hash ^ tail_hash
 
         return first_child, second_child
 
-    def __greedy_crossover(self, first_parent: list[int], second_parent: list[int]) -> tuple[list[int], list[int]]:
+    def __greedy_crossover(self, first_parent: Individual, second_parent: Individual) -> tuple[Individual, Individual]:
         new_individual = [presence_first_parent or presence_second_parent for presence_first_parent, presence_second_parent in zip(first_parent, second_parent)]
         existing_objects_indexes = [index for index, presence_new_individual in enumerate(new_individual) if presence_new_individual == 1]
         objects_for_greedy = [self.__objects[index] for index in existing_objects_indexes]
         greedy_solver = KnapsackGreedy()
-        greedy_solution = greedy_solver.get_solution(objects_for_greedy, self.__capacity)[0]
+        greedy_solution, sum_value, sum_weight = greedy_solver.get_solution(objects_for_greedy, self.__capacity)
         for index, value in enumerate(greedy_solution):
             new_individual[existing_objects_indexes[index]] = value
 
+        new_individual = Individual(new_individual, sum_value, sum_weight)
         return new_individual, new_individual
 
-    def __zigzag_crossover(self, first_parent: list[int], second_parent: list[int]) -> tuple[list[int], list[int]]:
+    def __zigzag_crossover(self, first_parent: Individual, second_parent: Individual) -> tuple[Individual, Individual]:
         first_child = []
         second_child = []
         zigzag_direction = 0
@@ -151,49 +235,61 @@ class KnapsackGenetic(BaseGenetic):
                 second_child.append(first_gene)
             zigzag_direction = zigzag_direction ^ 1
 
-        return first_child, second_child
+        return self.__get_individual_with_totals(first_child), self.__get_individual_with_totals(second_child)
 
-    def __crossover_with_correction(self, first_parent: list[int], second_parent: list[int]) -> tuple[list[int], list[int]]:
+    def __crossover_with_correction(self, first_parent: Individual, second_parent: Individual) -> tuple[Individual, Individual]:
         crossover_function = self.__crossover_function
         new_individuals = crossover_function(first_parent, second_parent)
         for individual in new_individuals:
-            self.__individual_correction(individual)
+            self.__individual_correction(individual, True)
         return new_individuals
 
     # Функции мутации
 
     def mutation_function(self, individual):
-        if self.__use_correction_after_each_step:
+        if self.use_correction_after_each_step:
             return self.__mutation_with_correction(individual)
         else:
             return self.__mutation_function(individual)
 
-    def __each_gene_mutation(self, individual: list[int]) -> list[int]:
+    def __each_gene_mutation(self, individual: Individual) -> Individual:
         probably_mutated_individual = individual.copy()
-        if self.__mutation_probability > 0:
-            for i, presence in enumerate(probably_mutated_individual):
-                random_value = random.random()
-                if random_value <= self.__mutation_probability:
-                    probably_mutated_individual[i] = presence ^ 1
+        if self.mutation_probability > 0:
+            self.__update_totals(probably_mutated_individual)
+            mutation_positions = self.random_stream.get_mutation_positions(len(probably_mutated_individual),
+                                                                          self.mutation_probability)
+            for i in mutation_positions:
+                self.__flip_gene(probably_mutated_individual, i)
 
         return probably_mutated_individual
 
-    def __one_gene_mutation(self, individual: list[int]) -> list[int]:
+    def __one_gene_mutation(self, individual: Individual) -> Individual:
         probably_mutated_individual = individual.copy()
-        if self.__mutation_probability > 0:
-            random_value = random.random()
-            if random_value <= self.__mutation_probability:
-                random_gene_index = random.randint(0, len(probably_mutated_individual) - 1)
-                probably_mutated_individual[random_gene_index] = probably_mutated_individual[random_gene_index] ^ 1
+        if self.mutation_probability > 0:
+            random_value = self.random_stream.random()
+            if random_value <= self.mutation_probability:
+                random_gene_index = self.random_stream.randint(0, len(probably_mutated_individual) - 1)
+                self.__update_totals(probably_mutated_individual)
+                self.__flip_gene(probably_mutated_individual, random_gene_index)
 
         return probably_mutated_individual
 
-    def __mutation_with_correction(self,  individual: list[int]) -> list[int]:
+    def __mutation_with_correction(self,  individual: Individual) -> Individual:
         mutation_function = self.__mutation_function
         probably_mutated_individual = mutation_function(individual)
-        self.__individual_correction(probably_mutated_individual)
+        self.__individual_correction(probably_mutated_individual, True)
         return probably_mutated_individual
 
+    # Локальный поиск
+
+    def local_search_function(self, individual: Individual) -> Individual:
+        self.__update_totals(individual)
+        genes = list(individual)
+        sum_value, sum_weight = self.__local_search.improve(genes, individual.sum_value, individual.sum_weight)
+        if sum_value <= individual.sum_value:
+            return None
+        return Individual(genes, sum_value, sum_weight)
+
     # Функции представления результата в виде строки
 
     def solution_to_string(self, solution: tuple[tuple[list[int], float, float], int]) -> str:
@@ -206,10 +302,110 @@ class KnapsackGenetic(BaseGenetic):
 
     # Общее
 
-    def __individual_correction(self, individual):
-        sum_weight = sum(y[1] for x, y in zip(individual, self.__objects) if x == 1)
-        while sum_weight > self.__capacity:
-            index_to_replace = random.choice([i for i, including in enumerate(individual) if including == 1])
-            individual[index_to_replace] = 0
-            sum_weight = sum_weight - self.__objects[index_to_replace][1]
+    def pack_population(self, population: list[Individual]) -> list[bytes]:
+        return [pack_genes(individual) for individual in population]
+
+    def unpack_population(self, packed_genomes: list[bytes]) -> list[Individual]:
+        return [self.__get_individual_with_totals(unpack_genes(packed_genes, self.__number_of_objects))
+                for packed_genes in packed_genomes]
+
+    def __get_individual_with_totals(self, genes: list[int]) -> Individual:
+        individual = Individual(genes)
+        self.__update_totals(individual)
+        return individual
+
+    def __update_totals(self, individual: Individual) -> None:
+        if not individual.has_totals():
+            individual.sum_value, individual.sum_weight = self.__get_segment_totals(individual, 0, len(individual))
+        if self.__zobrist_keys is not None and individual.genome_hash is None:
+            individual.genome_hash = self.__get_segment_hash(individual, 0, len(individual))
+
+    def __get_segment_totals(self, individual: list[int], start: int, end: int) -> tuple[float, float]:
+        sum_value = 0
+        sum_weight = 0
+        for i in range(start, end):
+            if individual[i]:
+                current_value, current_weight = self.__objects[i]
+                sum_value = sum_value + current_value
+                sum_weight = sum_weight + current_weight
+        return sum_value, sum_weight
+
+    def __get_segment_hash(self, individual: list[int], start: int, end: int) -> int:
+        # Ключи выбранных генов отбираются и сворачиваются XOR без цикла на уровне Python
+        return reduce(operator.xor, compress(self.__zobrist_keys[start:end], individual[start:end]), 0)
+
+    def __get_difference_hash(self, first_individual: list[int], second_individual: list[int], start: int,
+                              end: int) -> int:
+        differences = map(operator.ne, first_individual[start:end], second_individual[start:end])
+        return reduce(operator.xor, compress(self.__zobrist_keys[start:end], differences), 0)
+
+    def __flip_gene(self, individual: Individual, index: int) -> None:
+        current_value, current_weight = self.__objects[index]
+        if individual.genome_hash is not None:
+            individual.genome_hash = individual.genome_hash ^ self.__zobrist_keys[index]
+        if individual[index]:
+            individual[index] = 0
+            individual.sum_value = individual.sum_value - current_value
+            individual.sum_weight = individual.sum_weight - current_weight
+        else:
+            individual[index] = 1
+            individual.sum_value = individual.sum_value + current_value
+            individual.sum_weight = individual.sum_weight + current_weight
+
+    def __individual_correction(self, individual: Individual, use_cache: bool = False) -> None:
+        if self.profiler.is_enabled:
+            start_time = time.perf_counter()
+            self.__apply_correction(individual, use_cache)
+            self.__correction_time = self.__correction_time + time.perf_counter() - start_time
+        else:
+            self.__apply_correction(individual, use_cache)
+
+    def __apply_correction(self, individual: Individual, use_cache: bool) -> None:
+        self.__update_totals(individual)
+        if individual.sum_weight <= self.__capacity:
+            return
+
+        # При оценке коррекция уже закеширована вместе с оценкой, здесь кеш нужен коррекции после каждого шага.
+        # Эти обращения не входят в счетчики, которые считают одно обращение на оцененную особь
+        key = None
+        if use_cache and self.__fitness_cache is not None and self.__is_correction_cached:
+            key = individual.genome_hash ^ self.__correction_key_mask
+            entry = self.__fitness_cache.get(key, is_counted=False)
+            if entry is not None:
+                self.__apply_cache_entry(individual, entry)
+                return
+
+        self.__correction_function(individual)
+
+        if key is not None:
+            corrected_genes = bytes(individual)
+            entry = (individual.sum_value, corrected_genes, individual.sum_value, individual.sum_weight,
+                     individual.genome_hash)
+            self.__fitness_cache.put(key, entry)
+
+    # Функции коррекции
+
+    def __random_correction(self, individual: Individual) -> None:
+        # Индексы выбранных объектов собираются один раз, удаление - обменом с последним за O(1)
+        included_indexes = [i for i, including in enumerate(individual) if including == 1]
+        while individual.sum_weight > self.__capacity:
+            position = self.random_stream.randrange(len(included_indexes))
+            self.__flip_gene(individual, included_indexes[position])
+            included_indexes[position] = included_indexes[-1]
+            included_indexes.pop()
+
+    def __greedy_correction(self, individual: Individual) -> None:
+        # Первыми удаляются объекты с наименьшей удельной ценностью
+        for i in reversed(self.__sorted_indexes):
+            if individual.sum_weight <= self.__capacity:
+                break
+            if individual[i]:
+                self.__flip_gene(individual, i)
+
+    def __greedy_correction_with_refill(self, individual: Individual) -> None:
+        self.__greedy_correction(individual)
+        # Освободившееся место заполняется невыбранными объектами с наибольшей удельной ценностью
+        for i in self.__sorted_indexes:
+            if not individual[i] and individual.sum_weight + self.__objects[i][1] <= self.__capacity:
+                self.__flip_gene(individual, i)
 
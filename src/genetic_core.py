@@ -1,28 +1,113 @@
 import random
-import matplotlib.pyplot as plt
+import time
 from abc import ABC, abstractmethod
+from selection import Selection
+from convergence import ConvergenceMonitor
+from metrics import GenerationProfiler
+from random_stream import RandomStream
+from checkpoint import Checkpoint, CheckpointManager
+from greedy import KnapsackGreedy
 
 
 class BaseGenetic(ABC):
+    # Параметры запуска общие для всех представлений особей, классы задач передают их сюда через **kwargs
     def __init__(self,
-                 crossover_probability: float,
-                 number_of_iterations: int,
-                 number_of_iterations_without_changes: int,
-                 stop_if_without_changes: bool,
-                 use_elitism: bool,
-                 use_visualization: bool
+                 number_of_random_initial_individuals: int = 50,
+                 number_of_greedy_initial_individuals: int = 0,
+                 crossover_probability: float = 0.85,
+                 mutation_probability: float = 0.1,
+                 number_of_iterations: int = 2000,
+                 stop_if_without_changes: bool = False,
+                 number_of_iterations_without_changes: int = 50,
+                 use_elitism: bool = True,
+                 use_visualization: bool = False,
+                 use_correction_after_each_step: bool = False,
+                 selection_function: str = "roulette_wheel_selection",
+                 tournament_size: int = 2,
+                 time_limit: float = None,
+                 termination_criteria: list = None,
+                 adaptive_operator_rates=None,
+                 diversity_measure: str = "gene_entropy",
+                 diversity_check_interval: int = 1,
+                 metrics_hooks: list = None,
+                 rng: RandomStream = None,
+                 checkpoint_path: str = None,
+                 checkpoint_interval: int = None,
+                 initial_checkpoint: Checkpoint | str = None,
+                 resume_from_checkpoint: bool = False,
+                 keep_final_checkpoint: bool = False,
+                 improvement_callback=None,
+                 use_local_search: bool = False,
+                 local_search_fraction: float = 0.0,
+                 local_search_max_moves: int = None,
+                 seeding_solver=None,
+                 sorted_indexes: list[int] = None
                  ):
+        self.__number_of_random_initial_individuals = number_of_random_initial_individuals
+        self.__number_of_greedy_initial_individuals = number_of_greedy_initial_individuals
         self.__crossover_probability = crossover_probability
+        self.__mutation_probability = mutation_probability
+        self.__use_correction_after_each_step = use_correction_after_each_step
         self.__number_of_iterations = number_of_iterations
         self.__number_of_iterations_without_changes = number_of_iterations_without_changes
         self.__stop_if_without_changes = stop_if_without_changes
         self.__use_elitism = use_elitism
         self.__use_visualization = use_visualization
+        self.__selection_function = selection_function
+        self.__tournament_size = tournament_size
+        self.__time_limit = time_limit
+        self.__termination_criteria = termination_criteria
+        self.__adaptive_operator_rates = adaptive_operator_rates
+        self.__diversity_measure = diversity_measure
+        self.__diversity_check_interval = diversity_check_interval
+        self.__metrics_hooks = metrics_hooks
+        self.__rng = rng
+        self.__random_stream = rng
+        self.__checkpoint_path = checkpoint_path
+        self.__checkpoint_interval = checkpoint_interval
+        if isinstance(initial_checkpoint, str):
+            initial_checkpoint = Checkpoint.load(initial_checkpoint)
+        self.__initial_checkpoint = initial_checkpoint
+        self.__resume_from_checkpoint = resume_from_checkpoint
+        self.__keep_final_checkpoint = keep_final_checkpoint
+        self.__final_checkpoint = None
+        self.__profiler = None
+        self.__improvement_callback = improvement_callback
+        self.__use_local_search = use_local_search
+        self.__local_search_fraction = local_search_fraction
+        self.__local_search_max_moves = local_search_max_moves
+        self.__seeding_solver = seeding_solver if seeding_solver is not None else KnapsackGreedy()
+        # Порядок убывания удельной ценности может быть передан готовым, например сессией, которая его поддерживает
+        self.__sorted_indexes = sorted_indexes
+
+    @property
+    def number_of_random_initial_individuals(self):
+        return self.__number_of_random_initial_individuals
+
+    @property
+    def number_of_greedy_initial_individuals(self):
+        return self.__number_of_greedy_initial_individuals
 
     @property
     def crossover_probability(self):
         return self.__crossover_probability
 
+    @crossover_probability.setter
+    def crossover_probability(self, crossover_probability: float):
+        self.__crossover_probability = crossover_probability
+
+    @property
+    def mutation_probability(self):
+        return self.__mutation_probability
+
+    @mutation_probability.setter
+    def mutation_probability(self, mutation_probability: float):
+        self.__mutation_probability = mutation_probability
+
+    @property
+    def use_correction_after_each_step(self):
+        return self.__use_correction_after_each_step
+
     @property
     def number_of_iterations(self):
         return self.__number_of_iterations
@@ -43,6 +128,118 @@ class BaseGenetic(ABC):
     def use_visualization(self):
         return self.__use_visualization
 
+    @property
+    def selection_function(self):
+        return self.__selection_function
+
+    @property
+    def tournament_size(self):
+        return self.__tournament_size
+
+    @property
+    def time_limit(self):
+        return self.__time_limit
+
+    @property
+    def termination_criteria(self):
+        return self.__termination_criteria
+
+    @property
+    def adaptive_operator_rates(self):
+        return self.__adaptive_operator_rates
+
+    @property
+    def diversity_measure(self):
+        return self.__diversity_measure
+
+    @property
+    def diversity_check_interval(self):
+        return self.__diversity_check_interval
+
+    @property
+    def metrics_hooks(self):
+        return self.__metrics_hooks
+
+    @property
+    def rng(self):
+        return self.__rng
+
+    @rng.setter
+    def rng(self, rng: RandomStream):
+        self.__rng = rng
+
+    @property
+    def checkpoint_path(self):
+        return self.__checkpoint_path
+
+    @property
+    def checkpoint_interval(self):
+        return self.__checkpoint_interval
+
+    @property
+    def initial_checkpoint(self):
+        return self.__initial_checkpoint
+
+    @property
+    def resume_from_checkpoint(self):
+        return self.__resume_from_checkpoint
+
+    @property
+    def keep_final_checkpoint(self):
+        return self.__keep_final_checkpoint
+
+    @property
+    def final_checkpoint(self):
+        return self.__final_checkpoint
+
+    @final_checkpoint.setter
+    def final_checkpoint(self, final_checkpoint: Checkpoint):
+        self.__final_checkpoint = final_checkpoint
+
+    @property
+    def profiler(self) -> GenerationProfiler:
+        return self.__profiler
+
+    @profiler.setter
+    def profiler(self, profiler: GenerationProfiler):
+        self.__profiler = profiler
+
+    @property
+    def improvement_callback(self):
+        return self.__improvement_callback
+
+    @improvement_callback.setter
+    def improvement_callback(self, improvement_callback):
+        self.__improvement_callback = improvement_callback
+
+    @property
+    def use_local_search(self):
+        return self.__use_local_search
+
+    @property
+    def local_search_fraction(self):
+        return self.__local_search_fraction
+
+    @property
+    def local_search_max_moves(self):
+        return self.__local_search_max_moves
+
+    @property
+    def seeding_solver(self):
+        return self.__seeding_solver
+
+    @property
+    def sorted_indexes(self):
+        return self.__sorted_indexes
+
+    @property
+    def random_stream(self) -> RandomStream:
+        return self.__random_stream
+
+    def reset_random_stream(self) -> None:
+        # Без явно заданного генератора поток для запуска заводится от глобального random
+        self.__random_stream = self.__rng if self.__rng is not None else RandomStream(random.getrandbits(128))
+
     @abstractmethod
     def initial_population_function(self):
         pass
@@ -59,33 +256,100 @@ class BaseGenetic(ABC):
     def mutation_function(self, individual):
         pass
 
+    @abstractmethod
+    def pack_population(self, population) -> list[bytes]:
+        pass
+
+    @abstractmethod
+    def unpack_population(self, packed_genomes: list[bytes]):
+        pass
+
+    @abstractmethod
+    def get_solution_from_individual(self, individual) -> tuple[list[int], float, float]:
+        pass
+
+    @abstractmethod
+    def local_search_function(self, individual):
+        pass
+
+    def gene_frequencies_function(self, population) -> list[float]:
+        size_of_population = len(population)
+        return [sum(genes) / size_of_population for genes in zip(*population)]
+
+    def get_statistics(self) -> dict:
+        return {}
+
 
 class GeneticCore:
+    # Цикл поколений общий для всех движков. Наследники меняют только построение нового поколения,
+    # локальный поиск и работу с оценками (список Python или массив numpy)
 
-    def get_best_individual(self, genetic_task: BaseGenetic):
+    def __init__(self, migration=None):
+        self.__migration = migration
 
-        self.__genetic_task = genetic_task
+    @property
+    def genetic_task(self) -> BaseGenetic:
+        return self.__genetic_task
 
-        if self.__genetic_task.use_visualization:
-            self.__fitness_values = []
+    @property
+    def profiler(self) -> GenerationProfiler:
+        return self.__profiler
 
-        self.__population = self.__genetic_task.initial_population_function()
+    def get_best_individual(self, genetic_task: BaseGenetic):
 
-        iteration = 0
-        current_best_result_iteration = 0
-        iterations_without_changes = 0
-        fitness_scores = self.__genetic_task.fitness_evaluation_function(self.__population)
-        current_max = max(fitness_scores)
+        self.__genetic_task = genetic_task
+        convergence_monitor = ConvergenceMonitor(self.__genetic_task)
+        convergence_monitor.start()
+        self.__profiler = GenerationProfiler(self.__genetic_task)
+        # Задача замеряет по нему свои внутренние этапы, например коррекцию
+        self.__genetic_task.profiler = self.__profiler
+        self.__profiler.start()
+        self.start()
+
+        checkpoint_manager = CheckpointManager(self.__genetic_task)
+        checkpoint = checkpoint_manager.get_resume_checkpoint()
+
+        if checkpoint is None:
+            population = self.__genetic_task.initial_population_function()
+            iteration = 0
+            current_best_result_iteration = 0
+            iterations_without_changes = 0
+            fitness_scores = self.__genetic_task.fitness_evaluation_function(population)
+        else:
+            population = self.__genetic_task.unpack_population(checkpoint.packed_genomes)
+            iteration = checkpoint.iteration
+            current_best_result_iteration = checkpoint.current_best_result_iteration
+            iterations_without_changes = checkpoint.iterations_without_changes
+            fitness_scores = self.get_fitness_scores(checkpoint.fitness_scores)
+        current_max = fitness_scores[self.get_best_index(fitness_scores)]
+        best_fitness = current_max
+        self.__notify_improvement(iteration, population, fitness_scores)
 
         while iteration < self.__genetic_task.number_of_iterations:
-            self.__population = self.__get_new_population(fitness_scores)
-            fitness_scores = self.__genetic_task.fitness_evaluation_function(self.__population)
+            population = self.get_new_population(population, fitness_scores)
+            start_time = time.perf_counter()
+            fitness_scores = self.__genetic_task.fitness_evaluation_function(population)
+            if self.__profiler.is_enabled:
+                self.__profiler.add_time("fitness", start_time)
             iteration = iteration + 1
 
-            new_max = max(fitness_scores)
+            if self.__genetic_task.use_local_search:
+                start_time = time.perf_counter()
+                self.apply_local_search(population, fitness_scores)
+                if self.__profiler.is_enabled:
+                    self.__profiler.add_time("local_search", start_time)
+
+            if self.__migration is not None and iteration % self.__migration.migration_interval == 0:
+                start_time = time.perf_counter()
+                population, fitness_scores = self.__migration.migrate(population, fitness_scores, self.__genetic_task)
+                if self.__profiler.is_enabled:
+                    self.__profiler.add_time("migration", start_time)
+
+            new_max = fitness_scores[self.get_best_index(fitness_scores)]
+            diversity = convergence_monitor.update_diversity(iteration, population)
 
-            if self.__genetic_task.use_visualization:
-                self.__fitness_values.append(new_max)
+            if self.__profiler.is_enabled:
+                self.__profiler.finish_generation(iteration, new_max, fitness_scores, diversity)
 
             if new_max == current_max:
                 iterations_without_changes = iterations_without_changes + 1
@@ -93,37 +357,83 @@ class GeneticCore:
                 current_max = new_max
                 iterations_without_changes = 0
                 current_best_result_iteration = iteration
+                if new_max > best_fitness:
+                    best_fitness = new_max
+                    self.__notify_improvement(iteration, population, fitness_scores)
 
             if self.__genetic_task.stop_if_without_changes:
                 if iterations_without_changes >= self.__genetic_task.number_of_iterations_without_changes:
                     break
 
-        best_individual_index = fitness_scores.index(max(fitness_scores))
-        best_individual = self.__population[best_individual_index]
+            if convergence_monitor.is_terminated(iteration, new_max):
+                break
 
-        if self.__genetic_task.use_visualization:
-            self.__build_fitness_values_plot()
+            checkpoint_manager.on_generation(iteration, current_best_result_iteration, iterations_without_changes,
+                                             population, fitness_scores)
+
+        convergence_monitor.finish()
+        self.__profiler.finish()
+        checkpoint_manager.finish(iteration, current_best_result_iteration, iterations_without_changes,
+                                population, fitness_scores)
+
+        best_individual = population[self.get_best_index(fitness_scores)]
 
         return best_individual, current_best_result_iteration
 
-    def __get_new_population(self, fitness_scores: list[float]) -> list[list[int]]:
+    def __notify_improvement(self, iteration: int, population, fitness_scores) -> None:
+        # Без элитизма лучшая оценка может падать, поэтому сообщается только превышение прошлого рекорда
+        improvement_callback = self.__genetic_task.improvement_callback
+        if improvement_callback is not None:
+            best_individual = population[self.get_best_index(fitness_scores)]
+            improvement_callback(iteration, self.__genetic_task.get_solution_from_individual(best_individual))
+
+    # Шаги, которые зависят от представления популяции
+
+    def start(self) -> None:
+        self.__random_stream = self.__genetic_task.random_stream
+        self.__selection = Selection(self.__genetic_task.selection_function, self.__genetic_task.tournament_size,
+                                     self.__random_stream)
+
+    def get_fitness_scores(self, fitness_scores: list[float]) -> list[float]:
+        return list(fitness_scores)
+
+    def get_best_index(self, fitness_scores: list[float]) -> int:
+        return fitness_scores.index(max(fitness_scores))
+
+    def apply_local_search(self, population: list, fitness_scores: list[float]) -> None:
+        # Меметический этап: локальный поиск улучшает лучшую особь и случайную долю популяции
+        size_of_population = len(population)
+        indexes = {self.get_best_index(fitness_scores)}
+        number_of_sampled_individuals = int(size_of_population * self.__genetic_task.local_search_fraction)
+        if number_of_sampled_individuals > 0:
+            indexes.update(self.__random_stream.sample(range(size_of_population), number_of_sampled_individuals))
+        for i in sorted(indexes):
+            # Функция возвращает None, если особь не удалось улучшить
+            individual = self.__genetic_task.local_search_function(population[i])
+            if individual is not None:
+                population[i] = individual
+                fitness_scores[i] = self.__genetic_task.fitness_evaluation_function([individual])[0]
+
+    def get_new_population(self, population: list, fitness_scores: list[float]) -> list:
         new_population = []
-        size_of_population = len(self.__population)
+        size_of_population = len(population)
 
         if self.__genetic_task.use_elitism:
-            best_individual_index = fitness_scores.index(max(fitness_scores))
-            best_individual = self.__population[best_individual_index]
+            best_individual = population[self.get_best_index(fitness_scores)]
             for _ in range(2):
                 new_population.append(best_individual)
 
-        total_fitness = sum(fitness_scores)
-        probabilities = [score / total_fitness for score in fitness_scores]
-        intervals = self.__get_intervals(probabilities)
+        number_of_pairs = (size_of_population - len(new_population) + 1) // 2
+        start_time = time.perf_counter()
+        parents_indexes = self.__selection.get_parents_indexes(fitness_scores, 2 * number_of_pairs)
+        if self.__profiler.is_enabled:
+            self.__profiler.add_time("selection", start_time)
+            return self.__get_profiled_children(population, new_population, parents_indexes)
 
-        while len(new_population) < size_of_population:
-            selected_individuals = self.__get_random_pair_of_individuals(intervals)
+        for i in range(0, len(parents_indexes), 2):
+            selected_individuals = [population[parents_indexes[i]], population[parents_indexes[i + 1]]]
             new_individuals = selected_individuals.copy()
-            random_value = random.random()
+            random_value = self.__random_stream.random()
             if random_value <= self.__genetic_task.crossover_probability:
                 new_individuals = self.__genetic_task.crossover_function(*selected_individuals)
             for individual in new_individuals:
@@ -132,36 +442,20 @@ class GeneticCore:
 
         return new_population
 
-    def __get_intervals(self, probabilities: list[float]) -> list[float]:
-        intervals = []
-        cumulative_sum = 0
-
-        for probability in probabilities:
-            cumulative_sum = cumulative_sum + probability
-            intervals.append(cumulative_sum)
-
-        return intervals
-
-    def __get_random_pair_of_individuals(self, intervals: list[float]) -> list[list[int]]:
-        selected_individuals = []
-        for _ in range(2):
-
-            random_value = random.random()
-
-            for i, interval in enumerate(intervals):
-                if random_value <= interval:
-                    selected_individuals.append(self.__population[i])
-                    break
-
-        return selected_individuals
-
-    def __build_fitness_values_plot(self) -> None:
-        iterations = range(1, len(self.__fitness_values) + 1)
-
-        plt.plot(iterations, self.__fitness_values, marker='o', linestyle='-')
-        plt.xlabel('Iterations')
-        plt.ylabel('Fitness values')
-        plt.title('Fitness function plot by iterations')
-        plt.grid(True)
-        plt.show()
+    def __get_profiled_children(self, population: list, new_population: list, parents_indexes: list[int]) -> list:
+        # Тот же цикл, что и в get_new_population, но с замером времени каждой фазы
+        for i in range(0, len(parents_indexes), 2):
+            selected_individuals = [population[parents_indexes[i]], population[parents_indexes[i + 1]]]
+            new_individuals = selected_individuals.copy()
+            random_value = self.__random_stream.random()
+            if random_value <= self.__genetic_task.crossover_probability:
+                start_time = time.perf_counter()
+                new_individuals = self.__genetic_task.crossover_function(*selected_individuals)
+                self.__profiler.add_time("crossover", start_time)
+            start_time = time.perf_counter()
+            for individual in new_individuals:
+                probably_mutated_individual = self.__genetic_task.mutation_function(individual)
+                new_population.append(probably_mutated_individual)
+            self.__profiler.add_time("mutation", start_time)
 
+        return new_population
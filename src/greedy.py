@@ -2,11 +2,14 @@
 class KnapsackGreedy:
 
     def get_solution(self, objects: list[tuple[float, float]], capacity: int) -> tuple[list[int], float, float]:
-        relative_values = self.__get_relative_values(objects)
-        sorted_values = sorted(relative_values, key=lambda x: x[1], reverse=True)
+        sorted_values = self.get_sorted_relative_values(objects)
         result = self.__get_greedy_solution(objects, sorted_values, capacity)
         return result
 
+    def get_sorted_relative_values(self, objects: list[tuple[float, float]]) -> list[tuple[int, float]]:
+        relative_values = self.__get_relative_values(objects)
+        return sorted(relative_values, key=lambda x: x[1], reverse=True)
+
     def __get_relative_values(self, objects: list[tuple[float, float]]) -> list[tuple[int, float]]:
         result = []
         for i, (value, weight) in enumerate(objects):
@@ -0,0 +1,17 @@
+class Individual(list):
+    # Список генов, который хранит суммарные ценность и вес включенных объектов,
+    # чтобы операторы обновляли их приращениями, а не пересчитывали заново.
+    # Хеш Зобриста генома ведется так же, если включен кеш приспособленности
+    __slots__ = ("sum_value", "sum_weight", "genome_hash")
+
+    def __init__(self, genes=(), sum_value: float = None, sum_weight: float = None, genome_hash: int = None):
+        super().__init__(genes)
+        self.sum_value = sum_value
+        self.sum_weight = sum_weight
+        self.genome_hash = genome_hash
+
+    def copy(self) -> "Individual":
+        return Individual(self, self.sum_value, self.sum_weight, self.genome_hash)
+
+    def has_totals(self) -> bool:
+        return self.sum_value is not None and self.sum_weight is not None
@@ -0,0 +1,231 @@
+from array import array
+from collections.abc import Sequence
+import mmap
+import struct
+import sys
+
+
+# Бинарный формат: заголовок, затем столбец ценностей float64 и столбец весов int32 или float64,
+# все числа little-endian. Столбцы выровнены по 8 байтам и отображаются в память без копирования
+BINARY_MAGIC = b"KNAPSACK"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<8sHcx4xQd")
+
+INT32_MIN = -2 ** 31
+INT32_MAX = 2 ** 31 - 1
+
+
+class KnapsackInstance(Sequence):
+
+    def __init__(self, values, weights, capacity, path: str = None):
+        if len(values) != len(weights):
+            raise ValueError("Values and weights must have the same length")
+        self.__values = values
+        self.__weights = weights
+        self.__capacity = capacity
+        self.__path = path
+        self.__mapping = None
+
+    @property
+    def values(self):
+        return self.__values
+
+    @property
+    def weights(self):
+        return self.__weights
+
+    @property
+    def capacity(self):
+        return self.__capacity
+
+    @property
+    def path(self):
+        return self.__path
+
+    @property
+    def task_conditions(self) -> tuple["KnapsackInstance", float]:
+        return self, self.__capacity
+
+    def __len__(self) -> int:
+        return len(self.__values)
+
+    def __getitem__(self, index: int) -> tuple[float, float]:
+        return self.__values[index], self.__weights[index]
+
+    def __iter__(self):
+        return zip(self.__values, self.__weights)
+
+    def __repr__(self) -> str:
+        return f"KnapsackInstance(number_of_objects={len(self)}, capacity={self.__capacity})"
+
+    def __reduce__(self):
+        # Отображенный в память экземпляр передается в другие процессы по пути к файлу, а не по данным
+        if self.__mapping is not None:
+            return read_binary_instance, (self.__path,)
+        return KnapsackInstance, (array(self.__get_typecode(self.__values), self.__values),
+                                  array(self.__get_typecode(self.__weights), self.__weights), self.__capacity)
+
+    def set_mapping(self, mapping: mmap.mmap) -> None:
+        self.__mapping = mapping
+
+    def close(self) -> None:
+        if self.__mapping is not None:
+            self.__values.release()
+            self.__weights.release()
+            self.__mapping.close()
+            self.__mapping = None
+
+    def __get_typecode(self, column) -> str:
+        typecode = column.typecode if isinstance(column, array) else getattr(column, "format", "d")
+        return typecode if typecode in ("i", "q") else "d"
+
+
+# Текстовый формат: в первой строке вместимость, в остальных - пары "ценность вес"
+
+def read_text_instance(path: str, chunk_size: int = 1 << 20) -> KnapsackInstance:
+    # Столбцы остаются целыми int64, пока все числа файла целые, и переводятся в float64 при первом дробном
+    values = array('q')
+    weights = array('q')
+    with open(path, 'rb') as file:
+        capacity = _parse_number(file.readline().strip())
+        tail = b""
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            # Разбираются только полные строки, неполная последняя строка ждет следующего блока
+            data = tail + chunk
+            last_line_end = data.rfind(b"\n")
+            if last_line_end < 0:
+                tail = data
+                continue
+            values, weights = _extend_columns(values, weights, data[:last_line_end], path)
+            tail = data[last_line_end + 1:]
+        values, weights = _extend_columns(values, weights, tail, path)
+
+    return KnapsackInstance(values, weights, capacity)
+
+
+def _extend_columns(values: array, weights: array, lines: bytes, path: str) -> tuple[array, array]:
+    tokens = lines.split()
+    if len(tokens) % 2:
+        raise ValueError(f"Unpaired value in {path}")
+    numbers = None
+    if values.typecode == 'q':
+        try:
+            numbers = array('q', map(int, tokens))
+        except (ValueError, OverflowError):
+            values = array('d', values)
+            weights = array('d', weights)
+    if numbers is None:
+        numbers = array('d', map(float, tokens))
+    values.extend(numbers[0::2])
+    weights.extend(numbers[1::2])
+    return values, weights
+
+
+def write_text_instance(instance: KnapsackInstance, path: str) -> None:
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(f"{_format_number(instance.capacity)}\n")
+        file.writelines(f"{_format_number(value)} {_format_number(weight)}\n" for value, weight in instance)
+
+
+def _parse_number(token: bytes):
+    number = float(token)
+    return int(number) if number.is_integer() else number
+
+
+def _format_number(number) -> str:
+    number = float(number)
+    return str(int(number)) if number.is_integer() else repr(number)
+
+
+# Бинарный формат
+
+def write_binary_instance(instance: KnapsackInstance, path: str) -> None:
+    values = array('d', instance.values)
+    weights = array('d', instance.weights)
+    weights_typecode = b"d"
+    if all(weight.is_integer() and INT32_MIN <= weight <= INT32_MAX for weight in weights):
+        weights = array('i', map(int, weights))
+        weights_typecode = b"i"
+    if sys.byteorder != 'little':
+        values.byteswap()
+        weights.byteswap()
+
+    with open(path, 'wb') as file:
+        file.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, weights_typecode, len(values),
+                                      float(instance.capacity)))
+        file.write(values.tobytes())
+        file.write(weights.tobytes())
+        # Размер файла дополняется до границы 8 байт
+        file.write(b"\0" * (-len(weights) * weights.itemsize % 8))
+
+
+def read_binary_instance(path: str) -> KnapsackInstance:
+    with open(path, 'rb') as file:
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, weights_typecode, number_of_objects, capacity = BINARY_HEADER.unpack_from(mapping)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        mapping.close()
+        raise ValueError(f"{path} is not a binary knapsack instance")
+    weights_typecode = weights_typecode.decode()
+    values_start = BINARY_HEADER.size
+    weights_start = values_start + number_of_objects * 8
+    weights_end = weights_start + number_of_objects * struct.calcsize(weights_typecode)
+    if len(mapping) < weights_end:
+        mapping.close()
+        raise ValueError(f"{path} is truncated")
+    if capacity.is_integer():
+        capacity = int(capacity)
+
+    if sys.byteorder != 'little':
+        values = array('d', mapping[values_start:weights_start])
+        weights = array(weights_typecode, mapping[weights_start:weights_end])
+        values.byteswap()
+        weights.byteswap()
+        mapping.close()
+        return KnapsackInstance(values, weights, capacity)
+
+    buffer = memoryview(mapping)
+    values = buffer[values_start:weights_start].cast('d')
+    weights = buffer[weights_start:weights_end].cast(weights_typecode)
+    buffer.release()
+    instance = KnapsackInstance(values, weights, capacity, path)
+    instance.set_mapping(mapping)
+    return instance
+
+
+def is_binary_instance(path: str) -> bool:
+    with open(path, 'rb') as file:
+        return file.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def read_instance(path: str) -> KnapsackInstance:
+    if is_binary_instance(path):
+        return read_binary_instance(path)
+    return read_text_instance(path)
+
+
+def convert_instance(source_path: str, destination_path: str) -> None:
+    # Направление преобразования определяется форматом исходного файла
+    if is_binary_instance(source_path):
+        instance = read_binary_instance(source_path)
+        try:
+            write_text_instance(instance, destination_path)
+        finally:
+            instance.close()
+    else:
+        write_binary_instance(read_text_instance(source_path), destination_path)
+
+
+if __name__ == '__main__':
+    # argparse нужен только при запуске из командной строки, а не при чтении задач в рабочих процессах
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert a knapsack instance between the text and binary formats")
+    parser.add_argument("source")
+    parser.add_argument("destination")
+    arguments = parser.parse_args()
+    convert_instance(arguments.source, arguments.destination)
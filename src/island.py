@@ -0,0 +1,184 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from genetic_core import GeneticCore, BaseGenetic
+from genetic import KnapsackGenetic
+from individual import Individual
+from random_stream import RandomStream
+import multiprocessing
+import threading
+import random
+import os
+
+
+class IslandMigration:
+
+    def __init__(self,
+                 island_index: int,
+                 number_of_islands: int,
+                 number_of_migrants: int,
+                 migration_interval: int,
+                 topology: str,
+                 number_of_objects: int,
+                 barrier: threading.Barrier,
+                 genomes_memory: shared_memory.SharedMemory,
+                 scores_memory: shared_memory.SharedMemory
+                 ):
+        self.__island_index = island_index
+        self.__number_of_islands = number_of_islands
+        self.__number_of_migrants = number_of_migrants
+        self.__migration_interval = migration_interval
+        self.__source_islands = getattr(self, "_IslandMigration__get_" + topology + "_sources")()
+        self.__number_of_objects = number_of_objects
+        self.__barrier = barrier
+        self.__genomes = genomes_memory.buf
+        self.__scores = scores_memory.buf.cast('d')
+        self.__is_active = True
+
+    @property
+    def migration_interval(self):
+        return self.__migration_interval
+
+    def migrate(self, population: list[list[int]], fitness_scores: list[float],
+                genetic_task: BaseGenetic) -> tuple[list[list[int]], list[float]]:
+        if not self.__is_active:
+            return population, fitness_scores
+
+        number_of_migrants = min(self.__number_of_migrants, len(population))
+        ordered_indexes = sorted(range(len(population)), key=fitness_scores.__getitem__, reverse=True)
+
+        for slot, index in enumerate(ordered_indexes[:number_of_migrants]):
+            self.__write_individual(self.__island_index, slot, population[index], fitness_scores[index])
+
+        # Первый барьер - все острова записали мигрантов, второй - все острова их прочитали
+        try:
+            self.__barrier.wait()
+            migrants = []
+            for source_island in self.__source_islands:
+                for slot in range(number_of_migrants):
+                    migrants.append(self.__read_individual(source_island, slot))
+            self.__barrier.wait()
+        except threading.BrokenBarrierError:
+            # Какой-то остров уже закончил работу, дальше каждый остров развивается сам по себе
+            self.__is_active = False
+            return population, fitness_scores
+
+        migrants = sorted(migrants, key=lambda migrant: migrant[1], reverse=True)[:number_of_migrants]
+        new_population = list(population)
+        new_fitness_scores = list(fitness_scores)
+        new_individuals = [individual for individual, _ in migrants]
+        migrants_fitness_scores = genetic_task.fitness_evaluation_function(new_individuals)
+        for index, individual, score in zip(reversed(ordered_indexes), new_individuals, migrants_fitness_scores):
+            new_population[index] = individual
+            new_fitness_scores[index] = score
+
+        return new_population, new_fitness_scores
+
+    def stop(self) -> None:
+        self.__barrier.abort()
+
+    # Топологии
+
+    def __get_ring_sources(self) -> list[int]:
+        return [(self.__island_index - 1) % self.__number_of_islands]
+
+    def __get_fully_connected_sources(self) -> list[int]:
+        return [i for i in range(self.__number_of_islands) if i != self.__island_index]
+
+    # Общее
+
+    def __write_individual(self, island_index: int, slot: int, individual: list[int], score: float) -> None:
+        position = island_index * self.__number_of_migrants + slot
+        start = position * self.__number_of_objects
+        self.__genomes[start:start + self.__number_of_objects] = bytes(individual)
+        self.__scores[position] = score
+
+    def __read_individual(self, island_index: int, slot: int) -> tuple[Individual, float]:
+        position = island_index * self.__number_of_migrants + slot
+        start = position * self.__number_of_objects
+        return Individual(self.__genomes[start:start + self.__number_of_objects]), self.__scores[position]
+
+
+class KnapsackIslandGenetic:
+
+    def __init__(self,
+                 number_of_islands: int = None,
+                 number_of_migrants: int = 2,
+                 migration_interval: int = 50,
+                 topology: str = "ring",
+                 seed=None,
+                 rng: RandomStream = None,
+                 **genetic_parameters
+                 ):
+        self.__number_of_islands = number_of_islands if number_of_islands is not None else os.cpu_count()
+        self.__number_of_migrants = number_of_migrants
+        self.__migration_interval = migration_interval
+        self.__topology = topology
+        self.__seed = seed
+        self.__rng = rng
+        self.__genetic_parameters = genetic_parameters
+
+    def get_solution(self, objects: list[tuple[float, float]], capacity: int) -> tuple[tuple[list[int], float, float], int]:
+        number_of_objects = max(len(objects), 1)
+        slots = self.__number_of_islands * self.__number_of_migrants
+        genomes_memory = shared_memory.SharedMemory(create=True, size=max(slots * number_of_objects, 1))
+        scores_memory = shared_memory.SharedMemory(create=True, size=max(slots * 8, 8))
+        context = multiprocessing.get_context()
+        barrier = context.Barrier(self.__number_of_islands)
+        rng = self.__rng
+        if rng is None:
+            rng = RandomStream(self.__seed if self.__seed is not None else random.getrandbits(128))
+        # У каждого острова свой независимый поток, результат не зависит от планирования процессов
+        island_streams = rng.spawn(self.__number_of_islands)
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.__number_of_islands,
+                                     mp_context=context,
+                                     initializer=_initialize_island_worker,
+                                     initargs=(barrier, genomes_memory.name, scores_memory.name)) as executor:
+                futures = [executor.submit(_run_island, island_index, self.__number_of_islands,
+                                           self.__number_of_migrants, self.__migration_interval, self.__topology,
+                                           island_streams[island_index], self.__genetic_parameters, objects,
+                                           capacity)
+                           for island_index in range(self.__number_of_islands)]
+                results = [future.result() for future in futures]
+        finally:
+            genomes_memory.close()
+            genomes_memory.unlink()
+            scores_memory.close()
+            scores_memory.unlink()
+
+        return max(results, key=lambda result: result[0][1])
+
+    def solution_to_string(self, solution: tuple[tuple[list[int], float, float], int]) -> str:
+        (best_individual, sum_value, sum_weight), iterations_count = solution
+        result = (f"\nIsland genetic algorithm results\n"
+                  f"Objects: {best_individual}\n"
+                  f"Sum value: {sum_value} Sum weight: {sum_weight}\n"
+                  f"Number of iterations for best result: {iterations_count}")
+        return result
+
+
+# Состояние процесса-острова, задается один раз при запуске процесса
+
+_island_barrier = None
+_island_genomes_memory = None
+_island_scores_memory = None
+
+
+def _initialize_island_worker(barrier, genomes_memory_name: str, scores_memory_name: str) -> None:
+    global _island_barrier, _island_genomes_memory, _island_scores_memory
+    _island_barrier = barrier
+    _island_genomes_memory = shared_memory.SharedMemory(name=genomes_memory_name)
+    _island_scores_memory = shared_memory.SharedMemory(name=scores_memory_name)
+
+
+def _run_island(island_index: int, number_of_islands: int, number_of_migrants: int, migration_interval: int,
+                topology: str, random_stream: RandomStream, genetic_parameters: dict, objects: list[tuple[float, float]],
+                capacity: int) -> tuple[tuple[list[int], float, float], int]:
+    migration = IslandMigration(island_index, number_of_islands, number_of_migrants, migration_interval, topology,
+                                max(len(objects), 1), _island_barrier, _island_genomes_memory, _island_scores_memory)
+    genetic_solver = KnapsackGenetic(**genetic_parameters, rng=random_stream)
+    try:
+        return genetic_solver.get_solution(objects, capacity, GeneticCore(migration))
+    finally:
+        migration.stop()
@@ -0,0 +1,93 @@
+class LocalSearch:
+
+    MOVES = ("add_moves", "swap_moves", "exchange_moves")
+
+    def __init__(self, values: list[float], weights: list[float], capacity: float, sorted_indexes: list[int],
+                 max_number_of_moves: int = None):
+        self.__values = values
+        self.__weights = weights
+        self.__capacity = capacity
+        # Объекты в порядке убывания удельной ценности: добавляются с начала, удаляются с конца
+        self.__sorted_indexes = sorted_indexes
+        self.__reversed_indexes = sorted_indexes[::-1]
+        # По умолчанию бюджет ходов на одну особь пропорционален числу объектов
+        self.__max_number_of_moves = max_number_of_moves if max_number_of_moves is not None else 10 * len(values)
+        self.__min_weight = min(weights, default=0)
+        self.__moves = [getattr(self, "_LocalSearch__" + move) for move in self.MOVES]
+
+    def improve(self, genes: list[int], sum_value: float, sum_weight: float) -> tuple[float, float]:
+        # Гены меняются на месте, суммы пересчитываются приращениями, поэтому каждый ход стоит O(1).
+        # Каждая проверка кандидата расходует один ход из бюджета, так что поиск ограничен по времени
+        if sum_weight > self.__capacity:
+            return sum_value, sum_weight
+        self.__number_of_moves = 0
+        is_improved = True
+        while is_improved and self.__number_of_moves < self.__max_number_of_moves:
+            is_improved = False
+            for move in self.__moves:
+                new_value, sum_weight = move(genes, sum_value, sum_weight)
+                if new_value > sum_value:
+                    sum_value = new_value
+                    is_improved = True
+        return sum_value, sum_weight
+
+    # Ходы локального поиска
+
+    def __add_moves(self, genes: list[int], sum_value: float, sum_weight: float) -> tuple[float, float]:
+        for i in self.__sorted_indexes:
+            if self.__is_exhausted() or sum_weight + self.__min_weight > self.__capacity:
+                break
+            if not genes[i] and sum_weight + self.__weights[i] <= self.__capacity:
+                genes[i] = 1
+                sum_value = sum_value + self.__values[i]
+                sum_weight = sum_weight + self.__weights[i]
+        return sum_value, sum_weight
+
+    def __swap_moves(self, genes: list[int], sum_value: float, sum_weight: float) -> tuple[float, float]:
+        # Невыбранный объект с высокой удельной ценностью меняется на выбранный с низкой,
+        # если это увеличивает ценность и не переполняет рюкзак. Принимается первый улучшающий обмен
+        free_space = self.__capacity - sum_weight
+        for i in self.__sorted_indexes:
+            if genes[i]:
+                continue
+            for j in self.__reversed_indexes:
+                if self.__is_exhausted():
+                    return sum_value, sum_weight
+                if (genes[j] and self.__values[i] > self.__values[j]
+                        and self.__weights[i] - self.__weights[j] <= free_space):
+                    genes[i] = 1
+                    genes[j] = 0
+                    return (sum_value + self.__values[i] - self.__values[j],
+                            sum_weight + self.__weights[i] - self.__weights[j])
+        return sum_value, sum_weight
+
+    def __exchange_moves(self, genes: list[int], sum_value: float, sum_weight: float) -> tuple[float, float]:
+        # Один невыбранный объект вытесняет несколько выбранных с наименьшей удельной ценностью,
+        # пока не освободится место. Обмен принимается, если вытесненные объекты дешевле добавленного
+        for i in self.__sorted_indexes:
+            if genes[i]:
+                continue
+            required_space = sum_weight + self.__weights[i] - self.__capacity
+            removed_value = 0
+            removed_weight = 0
+            removed_indexes = []
+            for j in self.__reversed_indexes:
+                if self.__is_exhausted():
+                    return sum_value, sum_weight
+                if removed_weight >= required_space or removed_value >= self.__values[i]:
+                    break
+                if genes[j] and j != i:
+                    removed_value = removed_value + self.__values[j]
+                    removed_weight = removed_weight + self.__weights[j]
+                    removed_indexes.append(j)
+            if removed_weight >= required_space and removed_value < self.__values[i]:
+                genes[i] = 1
+                for j in removed_indexes:
+                    genes[j] = 0
+                return (sum_value + self.__values[i] - removed_value,
+                        sum_weight + self.__weights[i] - removed_weight)
+        return sum_value, sum_weight
+
+    def __is_exhausted(self) -> bool:
+        self.__number_of_moves = self.__number_of_moves + 1
+        return self.__number_of_moves > self.__max_number_of_moves
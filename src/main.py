@@ -1,70 +1,189 @@
 # Задача о рюкзаке (Knapstack problem)
-import string
+import argparse
+import json
 import os
-from pathlib import Path
+import sys
 from greedy import KnapsackGreedy
 from genetic import KnapsackGenetic
+from batch import create_solver, solve_many, SOLVERS, GENETIC_SOLVERS
+from random_stream import RandomStream
+from instance_io import KnapsackInstance, read_instance
 import random
 
 
-TASK_CONDITIONS_FILE_PATH = "task_conditions3.txt"
+# tests.ipynb берет решатели и функции задач через from main import *
+__all__ = ["KnapsackGreedy", "KnapsackGenetic", "random", "main", "read_task_conditions_from_file",
+           "get_random_task_conditions"]
+
+# Файлы задач в корне репозитория и их оптимальные решения:
 # task_conditions1 110101 33 37 включения/ценность/вес
 # task_conditions2 0001011101 82 57 включения/ценность/вес
 # task_conditions3 111111111111011 40 50 включения/ценность/вес
 
-USE_TASK_CONDITIONS_FROM_FILE = False
+# Если файлы задач не указаны, решается случайная задача с такими условиями
+RANDOM_TASK_CONDITIONS = dict(min_value=5, max_value=20, min_weight=1, max_weight=14, capacity=36)
+# Эти решатели принимают только целые веса, для них случайная задача строится с целыми весами
+INTEGER_WEIGHT_SOLVERS = ("dynamic",)
 
 
-def main() -> None:
-    random.seed(100)
+def main(argv: list[str] = None) -> None:
+    parser = get_argument_parser()
+    arguments = parser.parse_args(argv)
+    conditions_stream, solver_stream = RandomStream(arguments.seed).spawn(2)
 
-    task_conditions = None
-    if USE_TASK_CONDITIONS_FROM_FILE:
-        task_conditions = read_task_conditions_from_file(TASK_CONDITIONS_FILE_PATH)
+    if arguments.instances:
+        instances = [(path, read_instance(path)) for path in arguments.instances]
     else:
-        task_conditions = get_random_task_conditions(50, 5, 20, 1, 14, 36)
-    print("Task Conditions")
-    print(task_conditions)
-
-    greedy_solver = KnapsackGreedy()
-    greedy_result = greedy_solver.get_solution(*task_conditions)
-    print(greedy_solver.solution_to_string(greedy_result))
-
-    genetic_solver = KnapsackGenetic(
-        initial_population_function="get_initial_population",
-        fitness_evaluation_function="fitness_evaluation_without_zeroing_out",
-        crossover_function="single_point_crossover",
-        mutation_function="each_gene_mutation",
-        number_of_random_initial_individuals=100,
-        number_of_greedy_initial_individuals=0,
-        crossover_probability=0.85,
-        mutation_probability=0.01,
-        number_of_iterations=2000,
-        stop_if_without_changes=False,
-        number_of_iterations_without_changes=150,
-        use_elitism=True,
-        use_visualization=True,
-        use_correction_after_each_step=False
-    )
-    genetic_result = genetic_solver.get_solution(*task_conditions)
-    print(genetic_solver.solution_to_string(genetic_result))
-
-
-def read_task_conditions_from_file(filename: string) -> tuple[list, int]:
-    max_weight = 0
-    objects = []
-    with open(os.path.join(Path(__file__).resolve().parent.parent, filename), 'r') as file:
-        max_weight = int(file.readline().strip())
-
-        for line in file:
-            values = line.strip().split()
-            objects.append((int(values[0]), int(values[1]))) # (ценность, вес)
-    return objects, max_weight
+        objects, capacity = get_random_task_conditions(arguments.random_objects, RANDOM_TASK_CONDITIONS["min_value"],
+                                                       RANDOM_TASK_CONDITIONS["max_value"],
+                                                       RANDOM_TASK_CONDITIONS["min_weight"],
+                                                       RANDOM_TASK_CONDITIONS["max_weight"],
+                                                       RANDOM_TASK_CONDITIONS["capacity"], conditions_stream,
+                                                       arguments.solver in INTEGER_WEIGHT_SOLVERS)
+        instances = [("random", (objects, capacity))]
+
+    solver_config = get_solver_config(arguments)
+    try:
+        if arguments.solver in INTEGER_WEIGHT_SOLVERS:
+            # Дробные веса из файла - ошибка использования, она проверяется до запуска решателя,
+            # а ValueError изнутри решателя остается ошибкой программы
+            from dynamic import get_integer_weights
+            for path, instance in instances:
+                objects, capacity = instance.task_conditions if isinstance(instance, KnapsackInstance) else instance
+                try:
+                    get_integer_weights(objects, capacity)
+                except ValueError as error:
+                    parser.error(f"{arguments.solver}: {path}: {error}")
+        records = [get_record(path, instance, arguments.solver, result)
+                   for (path, instance), result in zip(instances, solve(instances, solver_config, arguments.workers,
+                                                                         solver_stream))]
+    finally:
+        for _, instance in instances:
+            if isinstance(instance, KnapsackInstance):
+                instance.close()
+    write_records(records, arguments.output, arguments.format)
+
+
+def get_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Solve knapsack instances and write the results as JSON")
+    parser.add_argument("instances", nargs="*",
+                        help="text or binary instance files, a random instance is solved if none are given")
+    parser.add_argument("--solver", default="genetic", choices=list(SOLVERS))
+    parser.add_argument("--seed", default="100", help="root seed, every instance gets its own spawned stream")
+    parser.add_argument("--random-objects", type=int, default=50, help="size of the random instance")
+    parser.add_argument("--workers", type=int, default=1, help="solve instances in a pool of worker processes")
+    parser.add_argument("--output", default="-", help="result file, standard output by default")
+    parser.add_argument("--format", default="json", choices=["json", "jsonl"])
+
+    genetic_arguments = parser.add_argument_group("genetic solvers")
+    genetic_arguments.add_argument("--initial-population-function", default="get_initial_population")
+    genetic_arguments.add_argument("--fitness-evaluation-function", default="fitness_evaluation_without_zeroing_out")
+    genetic_arguments.add_argument("--crossover-function", default="single_point_crossover")
+    genetic_arguments.add_argument("--mutation-function", default="each_gene_mutation")
+    genetic_arguments.add_argument("--selection-function", default="roulette_wheel_selection")
+    genetic_arguments.add_argument("--correction-function", default="greedy_correction")
+    genetic_arguments.add_argument("--population", type=int, default=100,
+                                   help="number of random initial individuals")
+    genetic_arguments.add_argument("--greedy-individuals", type=int, default=0,
+                                   help="number of greedy initial individuals")
+    genetic_arguments.add_argument("--crossover-probability", type=float, default=0.85)
+    genetic_arguments.add_argument("--mutation-probability", type=float, default=0.01)
+    genetic_arguments.add_argument("--iterations", type=int, default=2000)
+    genetic_arguments.add_argument("--iterations-without-changes", type=int, default=None,
+                                   help="stop after this many generations without improvement")
+    genetic_arguments.add_argument("--time-limit", type=float, default=None, help="seconds per instance")
+    genetic_arguments.add_argument("--no-elitism", action="store_true")
+    genetic_arguments.add_argument("--local-search", action="store_true",
+                                   help="improve the best individual of each generation by local search")
+    genetic_arguments.add_argument("--local-search-fraction", type=float, default=0.0,
+                                   help="fraction of the population that is also improved by local search")
+    genetic_arguments.add_argument("--local-search-max-moves", type=int, default=None,
+                                   help="move budget per individual, ten times the number of objects by default")
+    genetic_arguments.add_argument("--visualization", action="store_true", help="plot the fitness of each run")
+    return parser
+
+
+def get_solver_config(arguments: argparse.Namespace) -> dict:
+    solver_config = dict(solver=arguments.solver)
+    if arguments.solver not in GENETIC_SOLVERS:
+        return solver_config
+    solver_config.update(initial_population_function=arguments.initial_population_function,
+                         fitness_evaluation_function=arguments.fitness_evaluation_function,
+                         crossover_function=arguments.crossover_function,
+                         mutation_function=arguments.mutation_function,
+                         selection_function=arguments.selection_function,
+                         correction_function=arguments.correction_function,
+                         number_of_random_initial_individuals=arguments.population,
+                         number_of_greedy_initial_individuals=arguments.greedy_individuals,
+                         crossover_probability=arguments.crossover_probability,
+                         mutation_probability=arguments.mutation_probability,
+                         number_of_iterations=arguments.iterations,
+                         use_elitism=not arguments.no_elitism,
+                         use_visualization=arguments.visualization,
+                         time_limit=arguments.time_limit,
+                         use_local_search=arguments.local_search,
+                         local_search_fraction=arguments.local_search_fraction,
+                         local_search_max_moves=arguments.local_search_max_moves)
+    if arguments.iterations_without_changes is not None:
+        solver_config.update(stop_if_without_changes=True,
+                             number_of_iterations_without_changes=arguments.iterations_without_changes)
+    return solver_config
+
+
+def solve(instances: list[tuple[str, tuple]], solver_config: dict, workers: int, random_stream: RandomStream) -> list:
+    task_conditions = [instance for _, instance in instances]
+    if workers > 1:
+        # Потоки выдаются задачам в порядке номеров, поэтому результат не зависит от числа процессов
+        return [result for _, result in solve_many(task_conditions, solver_config, workers=workers, ordered=True,
+                                                    rng=random_stream)]
+
+    solver = create_solver(solver_config)
+    results = []
+    for instance in task_conditions:
+        objects, capacity = instance.task_conditions if isinstance(instance, KnapsackInstance) else instance
+        if hasattr(solver, "rng"):
+            solver.rng = random_stream.spawn(1)[0]
+        results.append(solver.get_solution(objects, capacity))
+    return results
+
+
+def get_record(path: str, instance, solver: str, result: tuple) -> dict:
+    objects, capacity = instance.task_conditions if isinstance(instance, KnapsackInstance) else instance
+    record = dict(instance=path, solver=solver, number_of_objects=len(objects), capacity=capacity)
+    if solver in GENETIC_SOLVERS:
+        result, record["best_result_iteration"] = result
+    objects_presence, sum_value, sum_weight = result
+    record.update(sum_value=float(sum_value), sum_weight=float(sum_weight), objects_presence=list(objects_presence))
+    return record
+
+
+def write_records(records: list[dict], path: str, output_format: str) -> None:
+    file = sys.stdout if path == "-" else open(path, 'w', encoding='utf-8')
+    try:
+        if output_format == "jsonl":
+            file.writelines(json.dumps(record) + "\n" for record in records)
+        else:
+            json.dump(records, file, indent=2)
+            file.write("\n")
+    finally:
+        if file is not sys.stdout:
+            file.close()
+
+
+def read_task_conditions_from_file(filename: str) -> tuple[list, int]:
+    # Текстовый или бинарный файл читается сразу в столбцы (ценность, вес)
+    instance = read_instance(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), filename))
+    return instance.task_conditions
 
 
 def get_random_task_conditions(number_of_objects: int, min_value: int, max_value: int, min_weight: int, max_weight: int,
-                               capacity: int) -> tuple[list[tuple[float, float]], int]:
-    objects = [(random.uniform(min_value, max_value), random.uniform(min_weight, max_weight)) for _ in range(number_of_objects)]
+                               capacity: int, random_stream: RandomStream = None,
+                               is_integer_weights: bool = False) -> tuple[list[tuple[float, float]], int]:
+    generator = random_stream if random_stream is not None else random
+    if is_integer_weights:
+        objects = [(generator.uniform(min_value, max_value), generator.randint(min_weight, max_weight)) for _ in range(number_of_objects)]
+    else:
+        objects = [(generator.uniform(min_value, max_value), generator.uniform(min_weight, max_weight)) for _ in range(number_of_objects)]
     return objects, capacity
 
 
@@ -0,0 +1,157 @@
+from collections import deque
+import csv
+import json
+import time
+
+
+class MetricsHook:
+
+    def on_start(self) -> None:
+        pass
+
+    def on_generation(self, metrics: dict) -> None:
+        pass
+
+    def on_finish(self) -> None:
+        pass
+
+
+class RingBufferExporter(MetricsHook):
+
+    def __init__(self, max_number_of_records: int = 1000):
+        self.__records = deque(maxlen=max_number_of_records)
+
+    @property
+    def records(self) -> list[dict]:
+        return list(self.__records)
+
+    def on_start(self) -> None:
+        self.__records.clear()
+
+    def on_generation(self, metrics: dict) -> None:
+        self.__records.append(metrics)
+
+
+class JsonLinesExporter(MetricsHook):
+
+    def __init__(self, path: str):
+        self.__path = path
+        self.__file = None
+
+    def on_start(self) -> None:
+        self.__file = open(self.__path, 'w', encoding='utf-8')
+
+    def on_generation(self, metrics: dict) -> None:
+        self.__file.write(json.dumps(metrics) + "\n")
+
+    def on_finish(self) -> None:
+        self.__file.close()
+        self.__file = None
+
+
+class CsvExporter(MetricsHook):
+
+    def __init__(self, path: str):
+        self.__path = path
+        self.__file = None
+        self.__writer = None
+
+    def on_start(self) -> None:
+        self.__file = open(self.__path, 'w', encoding='utf-8', newline='')
+        self.__writer = None
+
+    def on_generation(self, metrics: dict) -> None:
+        if self.__writer is None:
+            self.__writer = csv.DictWriter(self.__file, fieldnames=list(metrics), restval='')
+            self.__writer.writeheader()
+        self.__writer.writerow(metrics)
+
+    def on_finish(self) -> None:
+        self.__file.close()
+        self.__file = None
+
+
+class FitnessPlotExporter(MetricsHook):
+
+    def on_start(self) -> None:
+        self.__fitness_values = []
+
+    def on_generation(self, metrics: dict) -> None:
+        self.__fitness_values.append(metrics["best_fitness"])
+
+    def on_finish(self) -> None:
+        # matplotlib загружается только тогда, когда график действительно нужен
+        import matplotlib.pyplot as plt
+
+        iterations = range(1, len(self.__fitness_values) + 1)
+
+        plt.plot(iterations, self.__fitness_values, marker='o', linestyle='-')
+        plt.xlabel('Iterations')
+        plt.ylabel('Fitness values')
+        plt.title('Fitness function plot by iterations')
+        plt.grid(True)
+        plt.show()
+
+
+class GenerationProfiler:
+
+    # Фазы поколения не пересекаются. Время коррекции из статистики задачи (correction_time) входит
+    # в них повторно: коррекция выполняется внутри оценки, а с коррекцией после каждого шага - и внутри
+    # скрещивания и мутации, поэтому складывать его с фазами нельзя
+    PHASES = ("selection", "crossover", "mutation", "fitness", "local_search", "migration")
+
+    def __init__(self, genetic_task):
+        self.__genetic_task = genetic_task
+        self.__hooks = list(genetic_task.metrics_hooks or [])
+        if genetic_task.use_visualization:
+            self.__hooks.append(FitnessPlotExporter())
+
+    @property
+    def is_enabled(self) -> bool:
+        return bool(self.__hooks)
+
+    def start(self) -> None:
+        self.__timings = dict.fromkeys(self.PHASES, 0.0)
+        self.__statistics = self.__genetic_task.get_statistics()
+        if self.is_enabled:
+            # statistics тянет за собой fractions и re, поэтому загружается только при включенном профилировании
+            from statistics import fmean, pstdev
+            self.__mean_function = fmean
+            self.__std_function = pstdev
+        for hook in self.__hooks:
+            hook.on_start()
+
+    def add_time(self, phase: str, start_time: float) -> None:
+        self.__timings[phase] = self.__timings[phase] + time.perf_counter() - start_time
+
+    def finish_generation(self, iteration: int, best_fitness: float, fitness_scores, diversity: float) -> None:
+        metrics = {"iteration": iteration}
+        for phase, phase_time in self.__timings.items():
+            metrics[phase + "_time"] = phase_time
+
+        # Статистика задачи накапливается за весь запуск, в метриках - приращение за поколение
+        statistics = self.__genetic_task.get_statistics()
+        for name, value in statistics.items():
+            metrics[name] = value - self.__statistics.get(name, 0)
+        if "cache_hits" in metrics and "cache_misses" in metrics:
+            number_of_lookups = metrics["cache_hits"] + metrics["cache_misses"]
+            metrics["cache_hit_rate"] = metrics["cache_hits"] / number_of_lookups if number_of_lookups else None
+
+        metrics["best_fitness"] = float(best_fitness)
+        # Оценки векторизованного ядра - массив numpy, он считает среднее и отклонение сам
+        if hasattr(fitness_scores, "std"):
+            metrics["mean_fitness"] = float(fitness_scores.mean())
+            metrics["std_fitness"] = float(fitness_scores.std())
+        else:
+            metrics["mean_fitness"] = float(self.__mean_function(fitness_scores))
+            metrics["std_fitness"] = float(self.__std_function(fitness_scores))
+        metrics["diversity"] = diversity
+
+        self.__statistics = statistics
+        self.__timings = dict.fromkeys(self.PHASES, 0.0)
+        for hook in self.__hooks:
+            hook.on_generation(metrics)
+
+    def finish(self) -> None:
+        for hook in self.__hooks:
+            hook.on_finish()
@@ -0,0 +1,341 @@
+from genetic_core import BaseGenetic, GeneticCore
+from local_search import LocalSearch
+from array import array
+import time
+
+
+# Позиции установленных битов для каждого значения байта
+BYTE_BIT_POSITIONS = [[bit for bit in range(8) if byte >> bit & 1] for byte in range(256)]
+# Для каждой половины байта: младший установленный бит и половина байта без него
+NIBBLE_SPLITS = [((nibble & -nibble).bit_length() - 1, nibble & (nibble - 1)) for nibble in range(16)]
+# Шестнадцатеричные цифры в значения половин байта, чтобы разбивать геном на половины байтов без цикла Python
+HEX_DIGIT_TO_NIBBLE = bytes.maketrans(b'0123456789abcdef', bytes(range(16)))
+
+
+class KnapsackPackedGenetic(BaseGenetic):
+
+    def __init__(self,
+                 initial_population_function,
+                 fitness_evaluation_function,
+                 crossover_function,
+                 mutation_function,
+                 correction_function: str = "greedy_correction",
+                 **kwargs
+                 ):
+        super().__init__(**kwargs)
+        self.__initial_population_function = getattr(self, "_KnapsackPackedGenetic__" + initial_population_function)
+        self.__fitness_evaluation_function = getattr(self, "_KnapsackPackedGenetic__" + fitness_evaluation_function)
+        self.__crossover_function = getattr(self, "_KnapsackPackedGenetic__" + crossover_function)
+        self.__mutation_function = getattr(self, "_KnapsackPackedGenetic__" + mutation_function)
+        self.__correction_function = getattr(self, "_KnapsackPackedGenetic__" + correction_function)
+
+    def get_solution(self, objects: list[tuple[float, float]], capacity: int) -> tuple[tuple[list[int], float, float], int]:
+        self.__objects = objects
+        self.__capacity = capacity
+        self.__number_of_objects = len(objects)
+        self.__number_of_bytes = (self.__number_of_objects + 7) // 8
+        self.reset_random_stream()
+        self.__correction_time = 0.0
+        self.__full_mask = (1 << self.__number_of_objects) - 1
+        self.__even_genes_mask = int.from_bytes(b'\x55' * self.__number_of_bytes, 'little') & self.__full_mask
+        self.__value_table = self.__get_nibble_table([value for value, _ in objects])
+        self.__weight_table = self.__get_nibble_table([weight for _, weight in objects])
+        self.__table_offsets = range(0, self.__number_of_bytes << 5, 16)
+        if self.sorted_indexes is not None:
+            self.__sorted_indexes = self.sorted_indexes
+        else:
+            relative_values = [(i, value / weight) for i, (value, weight) in enumerate(objects)]
+            self.__sorted_indexes = [i for i, _ in sorted(relative_values, key=lambda x: x[1], reverse=True)]
+        self.__ranks = [0] * self.__number_of_objects
+        for rank, i in enumerate(self.__sorted_indexes):
+            self.__ranks[i] = rank
+        if self.use_local_search:
+            self.__local_search = LocalSearch([value for value, _ in objects], [weight for _, weight in objects],
+                                              capacity, self.__sorted_indexes, self.local_search_max_moves)
+        genetic_core = GeneticCore()
+        best_individual, iterations_count = genetic_core.get_best_individual(self)
+        result = self.get_solution_from_individual(best_individual)
+        return result, iterations_count
+
+    def get_solution_from_individual(self, best_individual: int) -> tuple[list[int], float, float]:
+        objects_presence = self.unpack_individual(best_individual)
+        sum_value, sum_weight = self.__get_sums(best_individual)
+        return objects_presence, sum_value, sum_weight
+
+    # Локальный поиск
+
+    def local_search_function(self, individual: int) -> int:
+        # Ходы выполняются над распакованным списком генов, где перестановка бита стоит O(1)
+        genes = self.unpack_individual(individual)
+        sum_value, sum_weight = self.__get_sums(individual)
+        new_value, _ = self.__local_search.improve(genes, sum_value, sum_weight)
+        if new_value <= sum_value:
+            return None
+        return self.pack_individual(genes)
+
+    # Упаковка и распаковка особей
+
+    def pack_individual(self, objects_presence: list[int]) -> int:
+        packed_bytes = bytearray(self.__number_of_bytes)
+        for i, presence in enumerate(objects_presence):
+            if presence:
+                packed_bytes[i >> 3] |= 1 << (i & 7)
+        return int.from_bytes(packed_bytes, 'little')
+
+    def unpack_individual(self, individual: int) -> list[int]:
+        return [int(bit) for bit in reversed(format(individual, f'0{self.__number_of_objects}b'))]
+
+    def pack_population(self, population: list[int]) -> list[bytes]:
+        # Упакованная особь уже хранит ген i в бите i, как и формат контрольной точки
+        return [individual.to_bytes(self.__number_of_bytes, 'little') for individual in population]
+
+    def unpack_population(self, packed_genomes: list[bytes]) -> list[int]:
+        return [int.from_bytes(packed_genes, 'little') & self.__full_mask for packed_genes in packed_genomes]
+
+    def gene_frequencies_function(self, population: list[int]) -> list[float]:
+        size_of_population = len(population)
+        bit_strings = [format(individual, f'0{self.__number_of_objects}b') for individual in population]
+        return [column.count('1') / size_of_population for column in map(''.join, zip(*bit_strings))][::-1]
+
+    @property
+    def number_of_objects(self):
+        return self.__number_of_objects
+
+    def get_statistics(self) -> dict:
+        return {"correction_time": self.__correction_time}
+
+    # Функции начальной инициализации
+
+    def initial_population_function(self):
+        return self.__initial_population_function()
+
+    def __get_initial_population(self) -> list[int]:
+        initial_population = []
+        if self.number_of_random_initial_individuals > 0:
+            for _ in range(self.number_of_random_initial_individuals):
+                new_individual = self.random_stream.getrandbits(self.__number_of_objects) if self.__number_of_objects > 0 else 0
+                initial_population.append(new_individual)
+        if self.number_of_greedy_initial_individuals > 0:
+            new_individual = self.pack_individual(self.seeding_solver.get_solution(self.__objects, self.__capacity)[0])
+            for _ in range(self.number_of_greedy_initial_individuals):
+                initial_population.append(new_individual)
+
+        return initial_population
+
+    def __get_initial_population_from_checkpoint(self) -> list[int]:
+        return self.unpack_population(self.initial_checkpoint.packed_genomes)
+
+    # Фитнесс функции
+
+    def fitness_evaluation_function(self, population):
+        return self.__fitness_evaluation_function(population)
+
+    def __simple_fitness_evaluation(self, population: list[int]) -> list[float]:
+        fitness_scores = []
+        for individual in population:
+            sum_value, sum_weight = self.__get_sums(individual)
+            if sum_weight > self.__capacity:
+                fitness_scores.append(0)
+            else:
+                fitness_scores.append(sum_value)
+
+        return fitness_scores
+
+    def __fitness_evaluation_without_zeroing_out(self, population: list[int]) -> list[float]:
+        fitness_scores = []
+        for i, individual in enumerate(population):
+            # Коррекция возвращает суммы исправленной особи, поэтому таблицы не просматриваются повторно
+            population[i], sum_value, _ = self.__individual_correction(individual)
+            fitness_scores.append(sum_value)
+
+        return fitness_scores
+
+    # Функции скрещивания
+
+    def crossover_function(self, first_parent, second_parent):
+        if self.use_correction_after_each_step:
+            return self.__crossover_with_correction(first_parent, second_parent)
+        else:
+            return self.__crossover_function(first_parent, second_parent)
+
+    def __single_point_crossover(self, first_parent: int, second_parent: int) -> tuple[int, int]:
+        crossover_point = self.random_stream.randint(0, self.__number_of_objects - 1)
+        head_mask = (1 << crossover_point) - 1
+        tail_mask = self.__full_mask ^ head_mask
+
+        first_child = (first_parent & head_mask) | (second_parent & tail_mask)
+        second_child = (second_parent & head_mask) | (first_parent & tail_mask)
+
+        return first_child, second_child
+
+    def __greedy_crossover(self, first_parent: int, second_parent: int) -> tuple[int, int]:
+        candidates = (first_parent | second_parent).to_bytes(self.__number_of_bytes, 'little')
+        new_individual_bytes = bytearray(self.__number_of_bytes)
+        free_space = self.__capacity
+        for i in self.__sorted_indexes:
+            if candidates[i >> 3] >> (i & 7) & 1:
+                current_weight = self.__objects[i][1]
+                remainder = free_space - current_weight
+                if remainder >= 0:
+                    new_individual_bytes[i >> 3] |= 1 << (i & 7)
+                    free_space = remainder
+
+                    if remainder == 0:
+                        break
+        new_individual = int.from_bytes(new_individual_bytes, 'little')
+
+        return new_individual, new_individual
+
+    def __zigzag_crossover(self, first_parent: int, second_parent: int) -> tuple[int, int]:
+        odd_genes_mask = self.__full_mask ^ self.__even_genes_mask
+
+        first_child = (first_parent & self.__even_genes_mask) | (second_parent & odd_genes_mask)
+        second_child = (second_parent & self.__even_genes_mask) | (first_parent & odd_genes_mask)
+
+        return first_child, second_child
+
+    def __crossover_with_correction(self, first_parent: int, second_parent: int) -> tuple[int, int]:
+        crossover_function = self.__crossover_function
+        first_child, second_child = crossover_function(first_parent, second_parent)
+        return self.__individual_correction(first_child)[0], self.__individual_correction(second_child)[0]
+
+    # Функции мутации
+
+    def mutation_function(self, individual):
+        if self.use_correction_after_each_step:
+            return self.__mutation_with_correction(individual)
+        else:
+            return self.__mutation_function(individual)
+
+    def __each_gene_mutation(self, individual: int) -> int:
+        if self.mutation_probability <= 0:
+            return individual
+        if self.mutation_probability >= 1:
+            return individual ^ self.__full_mask
+
+        mutation_mask = bytearray(self.__number_of_bytes)
+        for i in self.random_stream.get_mutation_positions(self.__number_of_objects, self.mutation_probability):
+            mutation_mask[i >> 3] |= 1 << (i & 7)
+
+        return individual ^ int.from_bytes(mutation_mask, 'little')
+
+    def __one_gene_mutation(self, individual: int) -> int:
+        if self.mutation_probability > 0:
+            random_value = self.random_stream.random()
+            if random_value <= self.mutation_probability:
+                random_gene_index = self.random_stream.randint(0, self.__number_of_objects - 1)
+                return individual ^ (1 << random_gene_index)
+
+        return individual
+
+    def __mutation_with_correction(self, individual: int) -> int:
+        mutation_function = self.__mutation_function
+        probably_mutated_individual = mutation_function(individual)
+        return self.__individual_correction(probably_mutated_individual)[0]
+
+    # Функции представления результата в виде строки
+
+    def solution_to_string(self, solution: tuple[tuple[list[int], float, float], int]) -> str:
+        (best_individual, sum_value, sum_weight), iterations_count = solution
+        result = (f"\nPacked genetic algorithm results\n"
+                  f"Objects: {best_individual}\n"
+                  f"Sum value: {sum_value} Sum weight: {sum_weight}\n"
+                  f"Number of iterations for best result: {iterations_count}")
+        return result
+
+    # Общее
+
+    def __get_nibble_table(self, numbers: list[float]) -> array:
+        # Для каждой четверки генов суммы по всем 16 комбинациям ее битов, четыре double на объект.
+        # Таблицы лежат подряд в порядке цифр bytes.hex(): в байте p сначала старшая половина (гены 8p+4..8p+7),
+        # затем младшая (гены 8p..8p+3), сумма половины k со значением v - элемент 16 * k + v
+        number_of_numbers = len(numbers)
+        table = array('d', bytes(self.__number_of_bytes << 8))
+        for nibble_index, offset in enumerate(range(0, len(table), 16)):
+            first_index = (nibble_index >> 1 << 3) + (0 if nibble_index & 1 else 4)
+            for nibble in range(1, 16):
+                lowest_bit, rest = NIBBLE_SPLITS[nibble]
+                index = first_index + lowest_bit
+                table[offset + nibble] = table[offset + rest] + (numbers[index] if index < number_of_numbers else 0)
+        return table
+
+    def __get_sums(self, individual: int) -> tuple[float, float]:
+        value_table = self.__value_table
+        weight_table = self.__weight_table
+        nibbles = individual.to_bytes(self.__number_of_bytes, 'little').hex().encode().translate(HEX_DIGIT_TO_NIBBLE)
+        sum_value = 0.0
+        sum_weight = 0.0
+        for offset, nibble in zip(self.__table_offsets, nibbles):
+            if nibble:
+                sum_value = sum_value + value_table[offset + nibble]
+                sum_weight = sum_weight + weight_table[offset + nibble]
+        return sum_value, sum_weight
+
+    def __get_included_indexes(self, individual: int) -> list[int]:
+        included_indexes = []
+        for byte_index, byte in enumerate(individual.to_bytes(self.__number_of_bytes, 'little')):
+            if byte:
+                first_index = byte_index << 3
+                included_indexes.extend(first_index + bit for bit in BYTE_BIT_POSITIONS[byte])
+        return included_indexes
+
+    def __individual_correction(self, individual: int) -> tuple[int, float, float]:
+        if self.profiler.is_enabled:
+            start_time = time.perf_counter()
+            correction_result = self.__get_corrected_individual(individual)
+            self.__correction_time = self.__correction_time + time.perf_counter() - start_time
+            return correction_result
+        return self.__get_corrected_individual(individual)
+
+    def __get_corrected_individual(self, individual: int) -> tuple[int, float, float]:
+        sum_value, sum_weight = self.__get_sums(individual)
+        if sum_weight <= self.__capacity:
+            return individual, sum_value, sum_weight
+        return self.__correction_function(individual, sum_value, sum_weight)
+
+    # Функции коррекции
+
+    def __random_correction(self, individual: int, sum_value: float, sum_weight: float) -> tuple[int, float, float]:
+        included_indexes = self.__get_included_indexes(individual)
+        removed_bytes = bytearray(self.__number_of_bytes)
+        while sum_weight > self.__capacity:
+            position = self.random_stream.randrange(len(included_indexes))
+            index_to_remove = included_indexes[position]
+            included_indexes[position] = included_indexes[-1]
+            included_indexes.pop()
+            removed_bytes[index_to_remove >> 3] |= 1 << (index_to_remove & 7)
+            current_value, current_weight = self.__objects[index_to_remove]
+            sum_value = sum_value - current_value
+            sum_weight = sum_weight - current_weight
+
+        return individual & ~int.from_bytes(removed_bytes, 'little'), sum_value, sum_weight
+
+    def __greedy_correction(self, individual: int, sum_value: float, sum_weight: float) -> tuple[int, float, float]:
+        # Выбранные объекты упорядочиваются по рангу удельной ценности, снятые биты копятся в маске
+        included_indexes = sorted(self.__get_included_indexes(individual), key=self.__ranks.__getitem__, reverse=True)
+        removed_bytes = bytearray(self.__number_of_bytes)
+        for index_to_remove in included_indexes:
+            if sum_weight <= self.__capacity:
+                break
+            removed_bytes[index_to_remove >> 3] |= 1 << (index_to_remove & 7)
+            current_value, current_weight = self.__objects[index_to_remove]
+            sum_value = sum_value - current_value
+            sum_weight = sum_weight - current_weight
+
+        return individual & ~int.from_bytes(removed_bytes, 'little'), sum_value, sum_weight
+
+    def __greedy_correction_with_refill(self, individual: int, sum_value: float,
+                                        sum_weight: float) -> tuple[int, float, float]:
+        corrected_individual, sum_value, sum_weight = self.__greedy_correction(individual, sum_value, sum_weight)
+        # Добавленные биты копятся в отдельной маске и объединяются с особью одной операцией
+        genes = corrected_individual.to_bytes(self.__number_of_bytes, 'little')
+        added_bytes = bytearray(self.__number_of_bytes)
+        for i in self.__sorted_indexes:
+            if not genes[i >> 3] >> (i & 7) & 1:
+                current_value, current_weight = self.__objects[i]
+                if sum_weight + current_weight <= self.__capacity:
+                    added_bytes[i >> 3] |= 1 << (i & 7)
+                    sum_value = sum_value + current_value
+                    sum_weight = sum_weight + current_weight
+
+        return corrected_individual | int.from_bytes(added_bytes, 'little'), sum_value, sum_weight
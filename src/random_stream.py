@@ -0,0 +1,53 @@
+import hashlib
+import math
+import random
+import secrets
+
+
+class RandomStream(random.Random):
+
+    def __init__(self, seed=None, spawn_key: tuple = (), number_of_children: int = 0):
+        # Как и в numpy.random.SeedSequence, поток задается исходным зерном и путем от корня,
+        # поэтому дочерние потоки не зависят от того, в каком процессе и в каком порядке они используются
+        self.__seed = seed if seed is not None else secrets.randbits(128)
+        self.__spawn_key = tuple(spawn_key)
+        self.__number_of_children = number_of_children
+        entropy = hashlib.blake2b(repr((self.__seed, self.__spawn_key)).encode(), digest_size=32).digest()
+        super().__init__(int.from_bytes(entropy, 'little'))
+
+    @property
+    def seed_value(self):
+        return self.__seed
+
+    @property
+    def spawn_key(self) -> tuple:
+        return self.__spawn_key
+
+    def __reduce__(self):
+        return self.__class__, (self.__seed, self.__spawn_key, self.__number_of_children), self.getstate()
+
+    def spawn(self, number_of_streams: int) -> list["RandomStream"]:
+        first_child = self.__number_of_children
+        self.__number_of_children = self.__number_of_children + number_of_streams
+        return [RandomStream(self.__seed, self.__spawn_key + (i,)) for i in range(first_child, self.__number_of_children)]
+
+    def get_numpy_generator(self):
+        # numpy нужен только векторизованному алгоритму, поэтому импортируется по требованию
+        import numpy as np
+        return np.random.default_rng(self.getrandbits(128))
+
+    def get_mutation_positions(self, number_of_genes: int, probability: float) -> list[int]:
+        if probability <= 0:
+            return []
+        if probability >= 1:
+            return list(range(number_of_genes))
+
+        # Вместо розыгрыша для каждого гена разыгрываются расстояния между
+        # мутирующими генами, они имеют геометрическое распределение
+        positions = []
+        log_probability = math.log(1 - probability)
+        i = int(math.log(1 - self.random()) / log_probability)
+        while i < number_of_genes:
+            positions.append(i)
+            i = i + 1 + int(math.log(1 - self.random()) / log_probability)
+        return positions
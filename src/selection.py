@@ -0,0 +1,105 @@
+from itertools import accumulate
+import bisect
+from random_stream import RandomStream
+
+
+def get_alias_table(fitness_scores: list[float]) -> tuple[list[float], list[int]]:
+    # Таблица Уолкера: столбец i выбирается с вероятностью probabilities[i], иначе выбирается aliases[i]
+    size_of_population = len(fitness_scores)
+    total_fitness = sum(fitness_scores)
+    if total_fitness <= 0:
+        return [1.0] * size_of_population, list(range(size_of_population))
+
+    scaled_probabilities = [score * size_of_population / total_fitness for score in fitness_scores]
+    probabilities = [1.0] * size_of_population
+    aliases = list(range(size_of_population))
+    small = [i for i, probability in enumerate(scaled_probabilities) if probability < 1]
+    large = [i for i, probability in enumerate(scaled_probabilities) if probability >= 1]
+
+    while small and large:
+        less = small.pop()
+        more = large[-1]
+        probabilities[less] = scaled_probabilities[less]
+        aliases[less] = more
+        scaled_probabilities[more] = scaled_probabilities[more] + scaled_probabilities[less] - 1
+        if scaled_probabilities[more] < 1:
+            large.pop()
+            small.append(more)
+
+    return probabilities, aliases
+
+
+class Selection:
+
+    def __init__(self, selection_function: str, tournament_size: int = 2, random_stream: RandomStream = None):
+        self.__selection_function = getattr(self, "_Selection__" + selection_function)
+        self.__tournament_size = tournament_size
+        self.__random = random_stream if random_stream is not None else RandomStream()
+
+    def get_parents_indexes(self, fitness_scores: list[float], number_of_parents: int) -> list[int]:
+        return self.__selection_function(fitness_scores, number_of_parents)
+
+    # Функции отбора
+
+    def __roulette_wheel_selection(self, fitness_scores: list[float], number_of_parents: int) -> list[int]:
+        intervals = self.__get_intervals(fitness_scores)
+        total_fitness = intervals[-1]
+        last_index = len(intervals) - 1
+
+        parents_indexes = []
+        for _ in range(number_of_parents):
+            random_value = self.__random.random() * total_fitness
+            parents_indexes.append(min(bisect.bisect_left(intervals, random_value), last_index))
+
+        return parents_indexes
+
+    def __alias_selection(self, fitness_scores: list[float], number_of_parents: int) -> list[int]:
+        probabilities, aliases = get_alias_table(fitness_scores)
+        size_of_population = len(fitness_scores)
+
+        parents_indexes = []
+        for _ in range(number_of_parents):
+            random_value = self.__random.random() * size_of_population
+            column = int(random_value)
+            if random_value - column < probabilities[column]:
+                parents_indexes.append(column)
+            else:
+                parents_indexes.append(aliases[column])
+
+        return parents_indexes
+
+    def __stochastic_universal_selection(self, fitness_scores: list[float], number_of_parents: int) -> list[int]:
+        intervals = self.__get_intervals(fitness_scores)
+        step = intervals[-1] / number_of_parents
+        pointer = self.__random.random() * step
+
+        parents_indexes = []
+        i = 0
+        last_index = len(intervals) - 1
+        for _ in range(number_of_parents):
+            while i < last_index and intervals[i] < pointer:
+                i = i + 1
+            parents_indexes.append(i)
+            pointer = pointer + step
+
+        # Указатели идут по порядку, поэтому перемешиваем, чтобы пары родителей были случайными
+        self.__random.shuffle(parents_indexes)
+        return parents_indexes
+
+    def __tournament_selection(self, fitness_scores: list[float], number_of_parents: int) -> list[int]:
+        size_of_population = len(fitness_scores)
+
+        parents_indexes = []
+        for _ in range(number_of_parents):
+            participants = [self.__random.randrange(size_of_population) for _ in range(self.__tournament_size)]
+            parents_indexes.append(max(participants, key=fitness_scores.__getitem__))
+
+        return parents_indexes
+
+    # Общее
+
+    def __get_intervals(self, fitness_scores: list[float]) -> list[float]:
+        intervals = list(accumulate(fitness_scores))
+        if intervals[-1] <= 0:
+            intervals = list(range(1, len(fitness_scores) + 1))
+        return intervals
@@ -0,0 +1,189 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator
+from batch import create_solver, GENETIC_SOLVERS
+from convergence import CancellationCriterion
+from greedy import KnapsackGreedy
+from random_stream import RandomStream
+import asyncio
+import os
+import time
+
+
+class SolveUpdate:
+
+    def __init__(self, solution: tuple[list[int], float, float], source: str, iteration: int, elapsed_time: float,
+                 is_final: bool = False):
+        self.__solution = solution
+        self.__source = source
+        self.__iteration = iteration
+        self.__elapsed_time = elapsed_time
+        self.__is_final = is_final
+
+    @property
+    def solution(self):
+        return self.__solution
+
+    @property
+    def sum_value(self):
+        return self.__solution[1]
+
+    @property
+    def source(self):
+        return self.__source
+
+    @property
+    def iteration(self):
+        return self.__iteration
+
+    @property
+    def elapsed_time(self):
+        return self.__elapsed_time
+
+    @property
+    def is_final(self):
+        return self.__is_final
+
+    def get_final(self, elapsed_time: float) -> "SolveUpdate":
+        return SolveUpdate(self.__solution, self.__source, self.__iteration, elapsed_time, True)
+
+    def __repr__(self) -> str:
+        return (f"SolveUpdate(source={self.__source!r}, sum_value={self.sum_value}, iteration={self.__iteration}, "
+                f"elapsed_time={self.__elapsed_time:.4f}, is_final={self.__is_final})")
+
+
+class KnapsackService:
+
+    def __init__(self,
+                 solver_config: dict,
+                 max_concurrent_requests: int = None,
+                 max_waiting_requests: int = None,
+                 executor: ThreadPoolExecutor = None,
+                 rng: RandomStream = None
+                 ):
+        if solver_config["solver"] not in GENETIC_SOLVERS:
+            raise ValueError(f"Service requires a genetic solver, got {solver_config['solver']}")
+        self.__solver_config = dict(solver_config)
+        self.__max_concurrent_requests = max_concurrent_requests if max_concurrent_requests is not None else os.cpu_count()
+        self.__max_waiting_requests = max_waiting_requests
+        # Решатель с замыканием обратного вызова не сериализуется для процесса, поэтому нужны потоки.
+        # Из-за GIL потоки делят одно ядро: параллельно идут только операции numpy векторизованного решателя
+        if executor is not None and not isinstance(executor, ThreadPoolExecutor):
+            raise ValueError(f"Service requires a ThreadPoolExecutor, got {type(executor).__name__}")
+        self.__is_own_executor = executor is None
+        self.__executor = executor if executor is not None else ThreadPoolExecutor(
+            max_workers=self.__max_concurrent_requests, thread_name_prefix="knapsack_service")
+        self.__rng = rng if rng is not None else RandomStream()
+        self.__semaphore = asyncio.Semaphore(self.__max_concurrent_requests)
+        self.__number_of_admitted_requests = 0
+        self.__active_cancellations = set()
+
+    @property
+    def max_concurrent_requests(self):
+        return self.__max_concurrent_requests
+
+    @property
+    def number_of_waiting_requests(self):
+        return self.__number_of_admitted_requests - len(self.__active_cancellations)
+
+    @property
+    def number_of_running_requests(self):
+        return len(self.__active_cancellations)
+
+    async def __aenter__(self) -> "KnapsackService":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for cancellation in list(self.__active_cancellations):
+            cancellation.cancel()
+        if self.__is_own_executor:
+            self.__executor.shutdown(wait=False, cancel_futures=True)
+
+    async def solve(self, objects: list[tuple[float, float]], capacity: float,
+                    timeout: float = None) -> AsyncIterator[SolveUpdate]:
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        # Жадное решение считается сразу в цикле событий и служит базовым ответом
+        best_update = SolveUpdate(KnapsackGreedy().get_solution(objects, capacity), "greedy", 0, 0.0)
+
+        # Запрос принимается, если есть место среди выполняемых и ожидающих, иначе получает только базовый ответ
+        if (self.__max_waiting_requests is not None and self.__number_of_admitted_requests
+                >= self.__max_concurrent_requests + self.__max_waiting_requests):
+            yield best_update.get_final(loop.time() - start_time)
+            return
+        self.__number_of_admitted_requests = self.__number_of_admitted_requests + 1
+        future = None
+        try:
+            yield best_update
+            try:
+                await asyncio.wait_for(self.__semaphore.acquire(), self.__get_remaining_time(deadline))
+            except asyncio.TimeoutError:
+                yield best_update.get_final(loop.time() - start_time)
+                return
+
+            updates = asyncio.Queue()
+            cancellation = CancellationCriterion(deadline)
+
+            def on_improvement(iteration: int, solution: tuple[list[int], float, float]) -> None:
+                loop.call_soon_threadsafe(updates.put_nowait, (iteration, solution))
+
+            def on_done(_) -> None:
+                # Место освобождается, только когда поток действительно закончил работу
+                self.__active_cancellations.discard(cancellation)
+                self.__number_of_admitted_requests = self.__number_of_admitted_requests - 1
+                self.__semaphore.release()
+                updates.put_nowait(None)
+
+            try:
+                genetic_solver = self.__create_solver(cancellation, on_improvement)
+                future = loop.run_in_executor(self.__executor, genetic_solver.get_solution, objects, capacity)
+            except BaseException:
+                self.__semaphore.release()
+                raise
+            self.__active_cancellations.add(cancellation)
+            future.add_done_callback(on_done)
+
+            try:
+                while True:
+                    try:
+                        update = await asyncio.wait_for(updates.get(), self.__get_remaining_time(deadline))
+                    except asyncio.TimeoutError:
+                        # Срок истек посреди поколения: возвращается лучшее найденное, поток остановится сам
+                        break
+                    if update is None:
+                        # Улучшения приходят раньше завершения, поэтому результат уже учтен, а ошибки пробрасываются
+                        future.result()
+                        break
+                    iteration, solution = update
+                    _, sum_value, sum_weight = solution
+                    if sum_value > best_update.sum_value and sum_weight <= capacity:
+                        best_update = SolveUpdate(solution, "genetic", iteration, loop.time() - start_time)
+                        yield best_update
+                yield best_update.get_final(loop.time() - start_time)
+            finally:
+                cancellation.cancel()
+        finally:
+            if future is None:
+                self.__number_of_admitted_requests = self.__number_of_admitted_requests - 1
+
+    async def solve_best(self, objects: list[tuple[float, float]], capacity: float,
+                         timeout: float = None) -> SolveUpdate:
+        async for update in self.solve(objects, capacity, timeout):
+            if update.is_final:
+                return update
+
+    def __create_solver(self, cancellation: CancellationCriterion, on_improvement):
+        solver_config = dict(self.__solver_config)
+        solver_config["termination_criteria"] = list(solver_config.get("termination_criteria") or []) + [cancellation]
+        solver_config["improvement_callback"] = on_improvement
+        solver_config["rng"] = self.__rng.spawn(1)[0]
+        return create_solver(solver_config)
+
+    def __get_remaining_time(self, deadline: float) -> float:
+        if deadline is None:
+            return None
+        return max(deadline - time.monotonic(), 0.0)
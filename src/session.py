@@ -0,0 +1,166 @@
+from batch import create_solver, GENETIC_SOLVERS
+from checkpoint import Checkpoint, pack_genes
+from random_stream import RandomStream
+import bisect
+
+
+class SortedRatioIndex:
+
+    def __init__(self):
+        # Записи (-удельная ценность, порядковый номер, ключ) хранятся отсортированными,
+        # изменение одного объекта - это одно удаление и одна вставка через bisect
+        self.__entries = []
+        self.__entries_by_key = {}
+        self.__number_of_insertions = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __iter__(self):
+        return ((key, -negative_ratio) for negative_ratio, _, key in self.__entries)
+
+    def add(self, key, value: float, weight: float) -> None:
+        entry = (-(value / weight), self.__number_of_insertions, key)
+        self.__number_of_insertions = self.__number_of_insertions + 1
+        bisect.insort(self.__entries, entry)
+        self.__entries_by_key[key] = entry
+
+    def remove(self, key) -> None:
+        entry = self.__entries_by_key.pop(key)
+        del self.__entries[bisect.bisect_left(self.__entries, entry)]
+
+
+class KnapsackSession:
+
+    def __init__(self,
+                 objects: list[tuple[float, float]] = None,
+                 capacity: float = 0,
+                 solver: str = "genetic",
+                 number_of_iterations: int = 500,
+                 number_of_resolve_iterations: int = 100,
+                 rng: RandomStream = None,
+                 **genetic_parameters
+                 ):
+        if solver not in GENETIC_SOLVERS:
+            raise ValueError(f"Session requires a genetic solver, got {solver}")
+        self.__solver = solver
+        self.__number_of_iterations = number_of_iterations
+        self.__number_of_resolve_iterations = number_of_resolve_iterations
+        self.__rng = rng if rng is not None else RandomStream()
+        self.__genetic_parameters = dict(initial_population_function="get_initial_population",
+                                         fitness_evaluation_function="fitness_evaluation_without_zeroing_out",
+                                         crossover_function="single_point_crossover",
+                                         mutation_function="each_gene_mutation")
+        self.__genetic_parameters.update(genetic_parameters)
+
+        self.__capacity = capacity
+        self.__objects = []
+        self.__keys = []
+        self.__positions = {}
+        self.__ratio_index = SortedRatioIndex()
+        # Популяция прошлого решения: особь - целое число, ген i - бит i, как в контрольной точке
+        self.__population = None
+        for key, (value, weight) in enumerate(objects or []):
+            self.add_item(key, value, weight)
+
+    @property
+    def objects(self):
+        return self.__objects
+
+    @property
+    def keys(self):
+        return self.__keys
+
+    @property
+    def capacity(self):
+        return self.__capacity
+
+    # Изменения задачи
+
+    def add_item(self, key, value: float, weight: float) -> None:
+        if key in self.__positions:
+            raise KeyError(f"Item {key!r} already exists")
+        # Новый объект получает последнюю позицию, в прошлых особях его ген равен нулю
+        self.__positions[key] = len(self.__objects)
+        self.__objects.append((value, weight))
+        self.__keys.append(key)
+        self.__ratio_index.add(key, value, weight)
+
+    def remove_item(self, key) -> None:
+        position = self.__positions.pop(key)
+        last_position = len(self.__objects) - 1
+        self.__ratio_index.remove(key)
+
+        # Удаленный объект замещается последним, в особях ген последнего объекта переносится на его место
+        if position != last_position:
+            last_key = self.__keys[last_position]
+            self.__objects[position] = self.__objects[last_position]
+            self.__keys[position] = last_key
+            self.__positions[last_key] = position
+        self.__objects.pop()
+        self.__keys.pop()
+
+        if self.__population is not None:
+            position_mask = 1 << position
+            last_mask = 1 << last_position
+            for i, individual in enumerate(self.__population):
+                moved_gene = position_mask if individual & last_mask else 0
+                self.__population[i] = (individual & ~position_mask & ~last_mask) | moved_gene
+
+    def update_item(self, key, value: float, weight: float) -> None:
+        position = self.__positions[key]
+        self.__objects[position] = (value, weight)
+        self.__ratio_index.remove(key)
+        self.__ratio_index.add(key, value, weight)
+
+    def set_capacity(self, capacity: float) -> None:
+        self.__capacity = capacity
+
+    # Решение
+
+    def get_sorted_relative_values(self) -> list[tuple[int, float]]:
+        return [(self.__positions[key], ratio) for key, ratio in self.__ratio_index]
+
+    def get_solution(self, objects: list[tuple[float, float]], capacity: float) -> tuple[list[int], float, float]:
+        # Жадное решение по поддерживаемому порядку, используется и для затравки начальной популяции
+        objects_presence = [0] * len(objects)
+        sum_value = 0
+        sum_weight = 0
+        for i, _ in self.get_sorted_relative_values():
+            current_value, current_weight = objects[i]
+            if sum_weight + current_weight <= capacity:
+                objects_presence[i] = 1
+                sum_value = sum_value + current_value
+                sum_weight = sum_weight + current_weight
+        return objects_presence, sum_value, sum_weight
+
+    def solve(self) -> tuple[tuple[list[int], float, float], int]:
+        # Задача получает поддерживаемый порядок объектов и не сортирует их заново при каждом решении
+        genetic_parameters = dict(self.__genetic_parameters, seeding_solver=self, keep_final_checkpoint=True,
+                                  sorted_indexes=[position for position, _ in self.get_sorted_relative_values()],
+                                  rng=self.__rng.spawn(1)[0])
+        if self.__population is None:
+            genetic_parameters["number_of_iterations"] = self.__number_of_iterations
+        else:
+            # Прошлая популяция продолжает эволюцию, переполненные особи исправляются при первой оценке
+            genetic_parameters["number_of_iterations"] = self.__number_of_resolve_iterations
+            genetic_parameters["initial_population_function"] = "get_initial_population_from_checkpoint"
+            genetic_parameters["initial_checkpoint"] = self.__get_population_checkpoint()
+
+        genetic_solver = create_solver(dict(genetic_parameters, solver=self.__solver))
+        result = genetic_solver.get_solution(self.__objects, self.__capacity)
+        self.__population = [int.from_bytes(packed_genes, 'little')
+                             for packed_genes in genetic_solver.final_checkpoint.packed_genomes]
+        return result
+
+    def get_selected_keys(self, solution: tuple[tuple[list[int], float, float], int]) -> list:
+        (objects_presence, _, _), _ = solution
+        return [self.__keys[i] for i, presence in enumerate(objects_presence) if presence]
+
+    def __get_population_checkpoint(self) -> Checkpoint:
+        number_of_bytes = (len(self.__objects) + 7) // 8
+        packed_genomes = [individual.to_bytes(number_of_bytes, 'little') for individual in self.__population]
+        # Одну особь заменяет жадное решение измененной задачи, для него не нужна пересортировка
+        if packed_genomes:
+            packed_genomes[-1] = pack_genes(self.get_solution(self.__objects, self.__capacity)[0])
+        return Checkpoint(len(self.__objects), packed_genomes, [0.0] * len(packed_genomes))
@@ -0,0 +1,267 @@
+from genetic_core import BaseGenetic
+from vectorized_genetic_core import VectorizedGeneticCore
+from instance_io import KnapsackInstance
+from local_search import LocalSearch
+import numpy as np
+import time
+
+
+class KnapsackVectorizedGenetic(BaseGenetic):
+
+    def __init__(self,
+                 initial_population_function,
+                 fitness_evaluation_function,
+                 crossover_function,
+                 mutation_function,
+                 correction_function: str = "greedy_correction",
+                 **kwargs
+                 ):
+        super().__init__(**kwargs)
+        self.__initial_population_function = getattr(self, "_KnapsackVectorizedGenetic__" + initial_population_function)
+        self.__fitness_evaluation_function = getattr(self, "_KnapsackVectorizedGenetic__" + fitness_evaluation_function)
+        self.__crossover_function = getattr(self, "_KnapsackVectorizedGenetic__" + crossover_function)
+        self.__mutation_function = getattr(self, "_KnapsackVectorizedGenetic__" + mutation_function)
+        self.__correction_function = getattr(self, "_KnapsackVectorizedGenetic__" + correction_function)
+
+    @property
+    def random_generator(self) -> np.random.Generator:
+        return self.__random_generator
+
+    def get_solution(self, objects: list[tuple[float, float]], capacity: int) -> tuple[tuple[list[int], float, float], int]:
+        self.__objects = objects
+        self.__capacity = capacity
+        self.__number_of_objects = len(objects)
+        if isinstance(objects, KnapsackInstance):
+            # Столбцы экземпляра читаются напрямую, без построения списка пар
+            self.__values = np.array(objects.values, dtype=np.float64)
+            self.__weights = np.array(objects.weights, dtype=np.float64)
+        else:
+            objects_array = np.asarray(objects, dtype=np.float64).reshape(-1, 2)
+            self.__values = objects_array[:, 0].copy()
+            self.__weights = objects_array[:, 1].copy()
+        if self.sorted_indexes is not None:
+            self.__sorted_indexes = np.asarray(self.sorted_indexes, dtype=np.intp)
+        else:
+            self.__sorted_indexes = np.argsort(-(self.__values / self.__weights), kind='stable')
+        if self.use_local_search:
+            # Ходы по одному объекту быстрее на списках Python, чем на отдельных элементах массивов numpy
+            self.__local_search = LocalSearch(self.__values.tolist(), self.__weights.tolist(), capacity,
+                                              self.__sorted_indexes.tolist(), self.local_search_max_moves)
+        self.__correction_time = 0.0
+        self.reset_random_stream()
+        self.__random_generator = self.random_stream.get_numpy_generator()
+        genetic_core = VectorizedGeneticCore()
+        best_individual, iterations_count = genetic_core.get_best_individual(self)
+        result = self.get_solution_from_individual(best_individual)
+        return result, iterations_count
+
+    def get_solution_from_individual(self, best_individual: np.ndarray) -> tuple[list[int], float, float]:
+        sum_value = float(best_individual @ self.__values)
+        sum_weight = float(best_individual @ self.__weights)
+        return best_individual.astype(int).tolist(), sum_value, sum_weight
+
+    @property
+    def number_of_objects(self):
+        return self.__number_of_objects
+
+    def get_statistics(self) -> dict:
+        return {"correction_time": self.__correction_time}
+
+    def gene_frequencies_function(self, population: np.ndarray) -> list[float]:
+        return population.mean(axis=0).tolist()
+
+    # Функции начальной инициализации
+
+    def initial_population_function(self):
+        return self.__initial_population_function()
+
+    def __get_initial_population(self) -> np.ndarray:
+        random_population = self.__random_generator.integers(
+            0, 2, size=(max(self.number_of_random_initial_individuals, 0), self.__number_of_objects), dtype=np.uint8)
+        greedy_population = np.zeros((max(self.number_of_greedy_initial_individuals, 0), self.__number_of_objects),
+                                     dtype=np.uint8)
+        if self.number_of_greedy_initial_individuals > 0:
+            greedy_population[:] = self.seeding_solver.get_solution(self.__objects, self.__capacity)[0]
+
+        return np.concatenate((random_population, greedy_population))
+
+    def __get_initial_population_from_checkpoint(self) -> np.ndarray:
+        return self.unpack_population(self.initial_checkpoint.packed_genomes)
+
+    # Фитнесс функции
+
+    def fitness_evaluation_function(self, population):
+        return self.__fitness_evaluation_function(population)
+
+    def __simple_fitness_evaluation(self, population: np.ndarray) -> np.ndarray:
+        sum_values = population @ self.__values
+        sum_weights = population @ self.__weights
+        sum_values[sum_weights > self.__capacity] = 0
+        return sum_values
+
+    def __fitness_evaluation_without_zeroing_out(self, population: np.ndarray) -> np.ndarray:
+        self.__population_correction(population)
+        return population @ self.__values
+
+    # Функции скрещивания
+
+    def crossover_function(self, first_parents, second_parents):
+        if self.use_correction_after_each_step:
+            return self.__crossover_with_correction(first_parents, second_parents)
+        else:
+            return self.__crossover_function(first_parents, second_parents)
+
+    def __single_point_crossover(self, first_parents: np.ndarray, second_parents: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        number_of_pairs, number_of_genes = first_parents.shape
+        crossover_points = self.__random_generator.integers(0, number_of_genes, size=number_of_pairs)
+        from_first_parent = np.arange(number_of_genes) < crossover_points[:, np.newaxis]
+
+        first_children = np.where(from_first_parent, first_parents, second_parents)
+        second_children = np.where(from_first_parent, second_parents, first_parents)
+
+        return first_children, second_children
+
+    def __greedy_crossover(self, first_parents: np.ndarray, second_parents: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        candidates = first_parents | second_parents
+        new_individuals = np.zeros_like(candidates)
+        free_space = np.full(len(candidates), self.__capacity, dtype=np.float64)
+        for i in self.__sorted_indexes:
+            weight = self.__weights[i]
+            fits = (candidates[:, i] == 1) & (free_space >= weight)
+            new_individuals[fits, i] = 1
+            free_space[fits] -= weight
+
+        return new_individuals, new_individuals.copy()
+
+    def __zigzag_crossover(self, first_parents: np.ndarray, second_parents: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        from_first_parent = np.arange(first_parents.shape[1]) % 2 == 0
+
+        first_children = np.where(from_first_parent, first_parents, second_parents)
+        second_children = np.where(from_first_parent, second_parents, first_parents)
+
+        return first_children, second_children
+
+    def __crossover_with_correction(self, first_parents: np.ndarray, second_parents: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        crossover_function = self.__crossover_function
+        new_individuals = crossover_function(first_parents, second_parents)
+        for children in new_individuals:
+            self.__population_correction(children)
+        return new_individuals
+
+    # Функции мутации
+
+    def mutation_function(self, population):
+        if self.use_correction_after_each_step:
+            return self.__mutation_with_correction(population)
+        else:
+            return self.__mutation_function(population)
+
+    def __each_gene_mutation(self, population: np.ndarray) -> np.ndarray:
+        probably_mutated_population = population.copy()
+        if self.mutation_probability > 0:
+            # Число мутаций во всем поколении биномиально, а их позиции равновероятны,
+            # поэтому разыгрываются только сами позиции, а не число для каждого гена
+            number_of_genes = population.size
+            number_of_mutations = self.__random_generator.binomial(number_of_genes, min(self.mutation_probability, 1.0))
+            mutation_positions = self.__random_generator.choice(number_of_genes, number_of_mutations, replace=False)
+            probably_mutated_population.reshape(-1)[mutation_positions] ^= 1
+
+        return probably_mutated_population
+
+    def __one_gene_mutation(self, population: np.ndarray) -> np.ndarray:
+        probably_mutated_population = population.copy()
+        if self.mutation_probability > 0:
+            number_of_individuals, number_of_genes = population.shape
+            mutated_individuals = np.flatnonzero(
+                self.__random_generator.random(number_of_individuals) <= self.mutation_probability)
+            random_genes_indexes = self.__random_generator.integers(0, number_of_genes, size=len(mutated_individuals))
+            probably_mutated_population[mutated_individuals, random_genes_indexes] ^= 1
+
+        return probably_mutated_population
+
+    def __mutation_with_correction(self, population: np.ndarray) -> np.ndarray:
+        mutation_function = self.__mutation_function
+        probably_mutated_population = mutation_function(population)
+        self.__population_correction(probably_mutated_population)
+        return probably_mutated_population
+
+    # Функции представления результата в виде строки
+
+    def solution_to_string(self, solution: tuple[tuple[list[int], float, float], int]) -> str:
+        (best_individual, sum_value, sum_weight), iterations_count = solution
+        result = (f"\nVectorized genetic algorithm results\n"
+                  f"Objects: {best_individual}\n"
+                  f"Sum value: {sum_value} Sum weight: {sum_weight}\n"
+                  f"Number of iterations for best result: {iterations_count}")
+        return result
+
+    # Локальный поиск
+
+    def local_search_function(self, individual: np.ndarray) -> np.ndarray:
+        genes = individual.tolist()
+        sum_value = float(individual @ self.__values)
+        sum_weight = float(individual @ self.__weights)
+        new_value, _ = self.__local_search.improve(genes, sum_value, sum_weight)
+        if new_value <= sum_value:
+            return None
+        return np.array(genes, dtype=individual.dtype)
+
+    # Общее
+
+    def pack_population(self, population: np.ndarray) -> list[bytes]:
+        return [row.tobytes() for row in np.packbits(population, axis=1, bitorder='little')]
+
+    def unpack_population(self, packed_genomes: list[bytes]) -> np.ndarray:
+        packed_population = np.frombuffer(b"".join(packed_genomes), dtype=np.uint8).reshape(len(packed_genomes), -1)
+        population = np.unpackbits(packed_population, axis=1, bitorder='little')[:, :self.__number_of_objects]
+        # Если объектов стало больше, недостающие гены равны нулю
+        missing_genes = self.__number_of_objects - population.shape[1]
+        return np.pad(population, ((0, 0), (0, missing_genes))) if missing_genes > 0 else population.copy()
+
+    def __population_correction(self, population: np.ndarray) -> None:
+        if self.profiler.is_enabled:
+            start_time = time.perf_counter()
+            self.__apply_correction(population)
+            self.__correction_time = self.__correction_time + time.perf_counter() - start_time
+        else:
+            self.__apply_correction(population)
+
+    def __apply_correction(self, population: np.ndarray) -> None:
+        overweight_indexes = np.flatnonzero(population @ self.__weights > self.__capacity)
+        if len(overweight_indexes) == 0:
+            return
+        population[overweight_indexes] = self.__correction_function(population[overweight_indexes])
+
+    # Функции коррекции
+
+    def __random_correction(self, overweight_population: np.ndarray) -> np.ndarray:
+        removal_order = np.tile(np.arange(self.__number_of_objects), (len(overweight_population), 1))
+        self.__random_generator.permuted(removal_order, axis=1, out=removal_order)
+        return self.__remove_in_order(overweight_population, removal_order)
+
+    def __greedy_correction(self, overweight_population: np.ndarray) -> np.ndarray:
+        # Один и тот же порядок удаления для всех строк, без копирования
+        removal_order = np.broadcast_to(self.__sorted_indexes[::-1], overweight_population.shape)
+        return self.__remove_in_order(overweight_population, removal_order)
+
+    def __greedy_correction_with_refill(self, overweight_population: np.ndarray) -> np.ndarray:
+        corrected_population = self.__greedy_correction(overweight_population)
+        # Объекты перебираются по одному, но каждый добавляется сразу во все строки, где он помещается
+        free_space = self.__capacity - corrected_population @ self.__weights
+        for i in self.__sorted_indexes:
+            weight = self.__weights[i]
+            fits = (corrected_population[:, i] == 0) & (free_space >= weight)
+            corrected_population[fits, i] = 1
+            free_space[fits] -= weight
+
+        return corrected_population
+
+    def __remove_in_order(self, overweight_population: np.ndarray, removal_order: np.ndarray) -> np.ndarray:
+        # Удаление объектов в заданном порядке до тех пор, пока рюкзак переполнен, оставляет
+        # самый длинный суффикс порядка, который помещается в рюкзак
+        ordered_weights = np.take_along_axis(overweight_population * self.__weights, removal_order, axis=1)
+        remaining_weights = np.cumsum(ordered_weights[:, ::-1], axis=1)[:, ::-1]
+        keep_mask = np.empty_like(overweight_population)
+        np.put_along_axis(keep_mask, removal_order, remaining_weights <= self.__capacity, axis=1)
+
+        return overweight_population & keep_mask
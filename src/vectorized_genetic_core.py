@@ -0,0 +1,107 @@
+import numpy as np
+import time
+from genetic_core import GeneticCore
+from selection import get_alias_table
+
+
+class VectorizedGeneticCore(GeneticCore):
+
+    def start(self) -> None:
+        self.__random_generator = self.genetic_task.random_generator
+        self.__selection_function = getattr(self, "_VectorizedGeneticCore__" + self.genetic_task.selection_function)
+
+    def get_fitness_scores(self, fitness_scores: list[float]) -> np.ndarray:
+        return np.array(fitness_scores, dtype=np.float64)
+
+    def get_best_index(self, fitness_scores: np.ndarray) -> int:
+        return int(fitness_scores.argmax())
+
+    def apply_local_search(self, population: np.ndarray, fitness_scores: np.ndarray) -> None:
+        size_of_population = len(population)
+        number_of_sampled_individuals = int(size_of_population * self.genetic_task.local_search_fraction)
+        indexes = self.__random_generator.choice(size_of_population, number_of_sampled_individuals, replace=False)
+        indexes = np.union1d(indexes, [fitness_scores.argmax()])
+        improved_indexes = []
+        for i in indexes:
+            individual = self.genetic_task.local_search_function(population[i])
+            if individual is not None:
+                population[i] = individual
+                improved_indexes.append(i)
+        if improved_indexes:
+            fitness_scores[improved_indexes] = self.genetic_task.fitness_evaluation_function(
+                population[improved_indexes])
+
+    def get_new_population(self, population: np.ndarray, fitness_scores: np.ndarray) -> np.ndarray:
+        size_of_population, number_of_genes = population.shape
+        genetic_task = self.genetic_task
+        profiler = self.profiler
+
+        if genetic_task.use_elitism:
+            best_individual = population[fitness_scores.argmax()]
+            elite = np.repeat(best_individual[np.newaxis, :], 2, axis=0)
+        else:
+            elite = population[:0]
+
+        number_of_children = size_of_population - len(elite)
+        number_of_pairs = (number_of_children + 1) // 2
+
+        start_time = time.perf_counter()
+        parents_indexes = self.__selection_function(fitness_scores, 2 * number_of_pairs)
+        if profiler.is_enabled:
+            profiler.add_time("selection", start_time)
+        first_parents = population[parents_indexes[0::2]]
+        second_parents = population[parents_indexes[1::2]]
+
+        crossover_mask = self.__random_generator.random(number_of_pairs) <= genetic_task.crossover_probability
+        if crossover_mask.any():
+            start_time = time.perf_counter()
+            first_children, second_children = genetic_task.crossover_function(first_parents[crossover_mask],
+                                                                              second_parents[crossover_mask])
+            first_parents[crossover_mask] = first_children
+            second_parents[crossover_mask] = second_children
+            if profiler.is_enabled:
+                profiler.add_time("crossover", start_time)
+
+        children = np.stack((first_parents, second_parents), axis=1).reshape(-1, number_of_genes)
+        start_time = time.perf_counter()
+        children = genetic_task.mutation_function(children[:number_of_children])
+        if profiler.is_enabled:
+            profiler.add_time("mutation", start_time)
+
+        return np.concatenate((elite, children))
+
+    # Функции отбора
+
+    def __roulette_wheel_selection(self, fitness_scores: np.ndarray, number_of_parents: int) -> np.ndarray:
+        intervals = self.__get_intervals(fitness_scores)
+        random_values = self.__random_generator.random(number_of_parents) * intervals[-1]
+        parents_indexes = np.searchsorted(intervals, random_values, side='left')
+        return np.minimum(parents_indexes, len(fitness_scores) - 1)
+
+    def __alias_selection(self, fitness_scores: np.ndarray, number_of_parents: int) -> np.ndarray:
+        probabilities, aliases = map(np.array, get_alias_table(fitness_scores.tolist()))
+        columns = self.__random_generator.integers(0, len(fitness_scores), size=number_of_parents)
+        use_column = self.__random_generator.random(number_of_parents) < probabilities[columns]
+        return np.where(use_column, columns, aliases[columns])
+
+    def __stochastic_universal_selection(self, fitness_scores: np.ndarray, number_of_parents: int) -> np.ndarray:
+        intervals = self.__get_intervals(fitness_scores)
+        step = intervals[-1] / number_of_parents
+        pointers = (self.__random_generator.random() + np.arange(number_of_parents)) * step
+        parents_indexes = np.minimum(np.searchsorted(intervals, pointers, side='left'), len(fitness_scores) - 1)
+        # searchsorted возвращает индексы по возрастанию, пары родителей составляются после перестановки
+        return self.__random_generator.permutation(parents_indexes)
+
+    def __tournament_selection(self, fitness_scores: np.ndarray, number_of_parents: int) -> np.ndarray:
+        participants = self.__random_generator.integers(
+            0, len(fitness_scores), size=(number_of_parents, self.genetic_task.tournament_size))
+        winners = fitness_scores[participants].argmax(axis=1)
+        return participants[np.arange(number_of_parents), winners]
+
+    # Общее
+
+    def __get_intervals(self, fitness_scores: np.ndarray) -> np.ndarray:
+        intervals = np.cumsum(fitness_scores, dtype=np.float64)
+        if intervals[-1] <= 0:
+            intervals = np.arange(1, len(fitness_scores) + 1, dtype=np.float64)
+        return intervals
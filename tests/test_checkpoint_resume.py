@@ -0,0 +1,34 @@
+import pytest
+
+from benchmark import InstanceGenerator
+from checkpoint import Checkpoint
+from genetic import KnapsackGenetic
+from packed_genetic import KnapsackPackedGenetic
+from random_stream import RandomStream
+from vectorized_genetic import KnapsackVectorizedGenetic
+
+OBJECTS, CAPACITY = InstanceGenerator().get_instance("uncorrelated", 120, RandomStream(1))
+FUNCTIONS = ("get_initial_population", "fitness_evaluation_without_zeroing_out", "single_point_crossover",
+             "each_gene_mutation")
+
+
+def get_genetic(genetic_class, selection_function: str, number_of_iterations: int, rng: RandomStream, **kwargs):
+    return genetic_class(*FUNCTIONS, number_of_random_initial_individuals=30, number_of_iterations=number_of_iterations,
+                         selection_function=selection_function, mutation_probability=0.02, rng=rng, **kwargs)
+
+
+@pytest.mark.parametrize("selection_function", ["roulette_wheel_selection", "tournament_selection"])
+@pytest.mark.parametrize("genetic_class", [KnapsackGenetic, KnapsackPackedGenetic, KnapsackVectorizedGenetic])
+def test_resumed_run_matches_straight_run(tmp_path, genetic_class, selection_function):
+    checkpoint_path = str(tmp_path / "checkpoint.ckpt")
+    straight_solution = get_genetic(genetic_class, selection_function, 60, RandomStream(5)).get_solution(OBJECTS, CAPACITY)
+
+    get_genetic(genetic_class, selection_function, 25, RandomStream(5),
+                checkpoint_path=checkpoint_path).get_solution(OBJECTS, CAPACITY)
+    assert Checkpoint.load(checkpoint_path).iteration == 25
+    # Состояние генератора берется из контрольной точки, поэтому другое зерно не должно влиять на результат
+    resumed_solution = get_genetic(genetic_class, selection_function, 60, RandomStream(99),
+                                   initial_checkpoint=checkpoint_path,
+                                   resume_from_checkpoint=True).get_solution(OBJECTS, CAPACITY)
+
+    assert resumed_solution == straight_solution
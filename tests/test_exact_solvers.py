@@ -0,0 +1,54 @@
+from itertools import product
+import random
+
+import pytest
+
+from branch_and_bound import KnapsackBranchAndBound
+from dynamic import KnapsackDP
+
+
+def get_brute_force_value(objects: list[tuple[float, float]], capacity: int) -> float:
+    best_value = 0
+    for presence in product((0, 1), repeat=len(objects)):
+        sum_weight = sum(weight for (_, weight), including in zip(objects, presence) if including)
+        if sum_weight <= capacity:
+            best_value = max(best_value, sum(value for (value, _), including in zip(objects, presence) if including))
+    return best_value
+
+
+def get_instances(is_subset_sum: bool) -> list[tuple[list[tuple[int, int]], int]]:
+    generator = random.Random(1 if is_subset_sum else 0)
+    instances = []
+    for _ in range(60):
+        number_of_objects = generator.randint(1, 10)
+        weights = [generator.randint(1, 40) for _ in range(number_of_objects)]
+        values = weights if is_subset_sum else [generator.randint(1, 40) for _ in range(number_of_objects)]
+        instances.append((list(zip(values, weights)), generator.randint(1, sum(weights))))
+    # Нулевая вместимость и объекты тяжелее рюкзака
+    instances.append(([(5, 3), (7, 7), (2, 1)], 0))
+    instances.append(([(50, 20), (60, 30), (3, 2)], 10))
+    instances.append(([(50, 20), (60, 30)], 10))
+    instances.append(([(20, 20), (30, 30), (2, 2), (7, 7)], 10))
+    instances.append(([(20, 20), (30, 30)], 0))
+    return instances
+
+
+def check_solution(objects: list[tuple[int, int]], capacity: int, solution: tuple[list[int], float, float]) -> None:
+    objects_presence, sum_value, sum_weight = solution
+    assert len(objects_presence) == len(objects)
+    assert sum_value == sum(value for (value, _), including in zip(objects, objects_presence) if including)
+    assert sum_weight == sum(weight for (_, weight), including in zip(objects, objects_presence) if including)
+    assert sum_weight <= capacity
+    assert sum_value == get_brute_force_value(objects, capacity)
+
+
+@pytest.mark.parametrize("is_subset_sum", [False, True], ids=["dp", "subset_sum"])
+def test_dynamic_programming_matches_brute_force(is_subset_sum):
+    for objects, capacity in get_instances(is_subset_sum):
+        check_solution(objects, capacity, KnapsackDP().get_solution(objects, capacity))
+
+
+@pytest.mark.parametrize("is_subset_sum", [False, True], ids=["general", "subset_sum"])
+def test_branch_and_bound_matches_brute_force(is_subset_sum):
+    for objects, capacity in get_instances(is_subset_sum):
+        check_solution(objects, capacity, KnapsackBranchAndBound().get_solution(objects, capacity))
@@ -0,0 +1,60 @@
+from functools import reduce
+from itertools import product
+import operator
+
+import pytest
+
+from benchmark import InstanceGenerator
+from fitness_cache import FitnessCache
+from genetic import KnapsackGenetic
+from genetic_core import GeneticCore
+from random_stream import RandomStream
+
+OBJECTS, CAPACITY = InstanceGenerator().get_instance("uncorrelated", 40, RandomStream(4))
+ZOBRIST_KEYS = FitnessCache.get_zobrist_keys(len(OBJECTS))
+
+
+class CheckedGeneticCore(GeneticCore):
+    # Проверяет суммы и хеш каждой особи после оценки (с коррекцией) и после скрещивания и мутации
+    number_of_checks = 0
+
+    def get_new_population(self, population: list, fitness_scores: list[float]) -> list:
+        self.__check_population(population)
+        new_population = super().get_new_population(population, fitness_scores)
+        self.__check_population(new_population)
+        return new_population
+
+    def __check_population(self, population: list) -> None:
+        for individual in population:
+            if individual.has_totals():
+                assert individual.sum_value == sum(value for (value, _), gene in zip(OBJECTS, individual) if gene)
+                assert individual.sum_weight == sum(weight for (_, weight), gene in zip(OBJECTS, individual) if gene)
+            if individual.genome_hash is not None:
+                included_keys = [key for key, gene in zip(ZOBRIST_KEYS, individual) if gene]
+                assert individual.genome_hash == reduce(operator.xor, included_keys, 0)
+            CheckedGeneticCore.number_of_checks = CheckedGeneticCore.number_of_checks + 1
+
+
+@pytest.mark.parametrize("fitness_cache_max_entries", [None, 1000], ids=["no_cache", "cache"])
+@pytest.mark.parametrize("use_correction_after_each_step", [False, True], ids=["after_evaluation", "after_each_step"])
+@pytest.mark.parametrize("fitness_evaluation_function",
+                         ["simple_fitness_evaluation", "fitness_evaluation_without_zeroing_out"])
+def test_totals_and_hash_match_recomputation(fitness_cache_max_entries, use_correction_after_each_step,
+                                             fitness_evaluation_function):
+    crossover_functions = ["single_point_crossover", "greedy_crossover", "zigzag_crossover"]
+    mutation_functions = ["each_gene_mutation", "one_gene_mutation"]
+    correction_functions = ["random_correction", "greedy_correction", "greedy_correction_with_refill"]
+    for crossover_function, mutation_function, correction_function in product(
+            crossover_functions, mutation_functions, correction_functions):
+        CheckedGeneticCore.number_of_checks = 0
+        genetic = KnapsackGenetic("get_initial_population", fitness_evaluation_function, crossover_function,
+                                  mutation_function, correction_function,
+                                  fitness_cache_max_entries=fitness_cache_max_entries,
+                                  number_of_random_initial_individuals=20, mutation_probability=0.2,
+                                  number_of_iterations=15, rng=RandomStream(7),
+                                  use_correction_after_each_step=use_correction_after_each_step)
+        (best_individual, sum_value, sum_weight), _ = genetic.get_solution(OBJECTS, CAPACITY,
+                                                                           CheckedGeneticCore())
+        assert CheckedGeneticCore.number_of_checks > 0
+        if fitness_evaluation_function == "fitness_evaluation_without_zeroing_out":
+            assert sum_weight <= CAPACITY